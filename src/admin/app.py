@@ -2,12 +2,20 @@ import streamlit as st
 from semantic_kernel.contents import ChatHistory, AuthorRole
 from azure.cosmos import CosmosClient
 from azure.identity import DefaultAzureCredential
+import base64
 import os
 import json
+import sys
 from dotenv import load_dotenv
 from dapr.actor import ActorProxy, ActorId, ActorInterface, actormethod
 import logging
 
+# NOTE the actor state modules are shared with the agents, they are copied next to the app in the
+# container image (see dockerfile), and read from src/agents when running locally
+sys.path.append(os.path.join(os.path.dirname(__file__), "../agents"))
+from actors.history_state import read_history
+from actors.state_serializer import CompactStateSerializer
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Ensure logging level is set as required
 
@@ -21,20 +29,28 @@ cosmos_client = CosmosClient(
 )
 db_client = cosmos_client.get_database_client(os.getenv("COSMOSDB_DATABASE"))
 container_client = db_client.get_container_client(os.getenv("COSMOSDB_CONTAINER"))
+# Reads both the values encoded by the agents and the plain JSON of earlier versions
+state_serializer = CompactStateSerializer()
 
 
 def list_order_actors():
+    # NOTE the history is stored as a head and numbered segments (or as a single "history" item
+    # by earlier versions), each actor is listed once through its head
     result = container_client.query_items(
-        query="SELECT c.id FROM c WHERE CONTAINS(c.id, 'agents||ProcessingActor||order')",
+        query=(
+            "SELECT c.id FROM c WHERE CONTAINS(c.id, 'agents||ProcessingActor||order') "
+            "AND (ENDSWITH(c.id, '||history_head') OR ENDSWITH(c.id, '||history'))"
+        ),
         # NOTE not super efficient, but we need to get all actors in the container
         enable_cross_partition_query=True,
     )
 
     actor_list = []
     for item in result:
-        actor_list.append(item["id"])
+        # The actor key is the item id without the state name, e.g. "agents||ProcessingActor||order_id"
+        actor_list.append(item["id"].rsplit("||", 1)[0])
 
-    return actor_list
+    return list(dict.fromkeys(actor_list))
 
 
 def list_users_actors():
@@ -52,7 +68,8 @@ def list_users_actors():
         user_id = item["id"].split("||")[2]
         actor_list.append({"id": user_id, "displayName": user_id})
 
-    return actor_list
+    # Each actor has several state items
+    return list({user["id"]: user for user in actor_list}.values())
 
 
 order_list = list_order_actors()
@@ -94,12 +111,7 @@ async def main():
     )
 
     if order_id is not None:
-        doc = container_client.read_item(
-            item=order_id,
-            partition_key=order_id.replace("||history", ""),
-        )
-        state = doc.get("value")
-        state = ChatHistory.model_validate(state)
+        state = await read_order_history(order_id)
 
         if state is not None:
 
@@ -135,6 +147,31 @@ class UserActorInterface(ActorInterface):
     async def notify(self, message: str | dict) -> None: ...
 
 
+async def read_order_history(actor_key: str) -> ChatHistory:
+    # NOTE the state is read from the store rather than through the actor, which would make us wait
+    # for the order being processed, and activate every actor we look at
+    result = container_client.query_items(
+        query="SELECT * FROM c WHERE STARTSWITH(c.id, @prefix)",
+        parameters=[{"name": "@prefix", "value": f"{actor_key}||"}],
+        # The actor state items are partitioned by actor
+        partition_key=actor_key,
+    )
+    states = {item["id"][len(actor_key) + 2 :]: item for item in result}
+
+    async def get_state(name: str):
+        item = states.get(name)
+        if item is None:
+            return False, None
+        # Dapr stores JSON values as is, and other values in base64
+        if item.get("isBinary"):
+            data = base64.b64decode(item["value"])
+        else:
+            data = json.dumps(item["value"]).encode("utf-8")
+        return True, state_serializer.deserialize(data)
+
+    return await read_history(get_state)
+
+
 async def send_notification(user_id: str, message: str):
     # Use Dapr UserActor proxy to send a notification
     proxy: UserActorInterface = ActorProxy.create("UserActor", ActorId(user_id), UserActorInterface)
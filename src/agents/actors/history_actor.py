@@ -0,0 +1,61 @@
+import logging
+
+from semantic_kernel.contents.chat_history import ChatHistory
+from utils.config import config
+from order.order_team import history_summarizer
+
+from actors.history_state import HistoryState, active_history_state, restore_payloads
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryActorMixin:
+    """
+    Chat history handling shared by the actors, persisted with HistoryState.
+    The history is only loaded by the methods that need it, as a window of its last segments.
+    Actors must call _init_history_state when activated.
+    """
+
+    history: ChatHistory | None = None
+
+    def _init_history_state(self) -> None:
+        self._history_state = HistoryState(
+            self._state_manager,
+            config.ACTOR_HISTORY_SEGMENT_SIZE,
+            summarizer=history_summarizer.summarize if config.ACTOR_HISTORY_SUMMARY else None,
+        )
+
+    async def get_history(self) -> dict:
+        logger.debug(f"Getting conversation history for actor {self.id}")
+        # The whole history, even when only a window of it is loaded
+        if self.history is not None and not self._history_state.is_windowed:
+            history = self.history.model_dump()
+            # The compacted tool results are given whole, as read() does
+            await restore_payloads(history["messages"], self._state_manager.try_get_state)
+            return history
+        return (await self._history_state.read()).model_dump()
+
+    async def _load_history(self) -> ChatHistory:
+        # The agents invoked in this turn fetch the compacted tool results from this state
+        active_history_state.set(self._history_state)
+        if self.history is None:
+            self.history = await self._history_state.load(config.ACTOR_HISTORY_WINDOW_SEGMENTS)
+            logger.debug(f"Loaded {len(self.history.messages)} history messages for actor {self.id}")
+        return self.history
+
+    async def _compact_tool_results(self, start: int) -> None:
+        # The large tool results were consumed during the turn, later turns only get their digest
+        if config.ACTOR_TOOL_RESULT_MAX_LENGTH > 0:
+            await self._history_state.compact_tool_results(
+                self.history, start, config.ACTOR_TOOL_RESULT_MAX_LENGTH
+            )
+
+    async def _save_history(self) -> None:
+        """
+        Save the conversation history to the actor's state.
+        This is called automatically when the actor is deactivated.
+        """
+        logger.debug(f"Saving conversation history for actor {self.id}")
+        # Only the segments with new messages are written
+        await self._history_state.save(self.history)
+        logger.info(f"State saved successfully for actor {self.id}")
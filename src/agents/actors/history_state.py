@@ -0,0 +1,363 @@
+import asyncio
+import hashlib
+import logging
+import re
+from collections.abc import Awaitable, Callable
+from contextvars import ContextVar
+from typing import Any
+
+from dapr.actor.runtime.state_manager import ActorStateManager
+from semantic_kernel.contents.chat_history import ChatHistory
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+logger = logging.getLogger(__name__)
+
+HEAD_STATE = "history_head"
+SEGMENT_STATE = "history_{index}"
+# Whole history written by earlier versions, migrated to segments on the next save
+LEGACY_STATE = "history"
+# Name of the system note standing for the messages before the loaded window
+HISTORY_NOTE_NAME = "history_note"
+# Tool results moved out of the history, by content hash, and the metadata key of the compacted results
+PAYLOAD_STATE = "payload_{digest}"
+PAYLOAD_METADATA = "payload"
+# Reference to a payload given in the compacted results, for the agents to fetch it
+PAYLOAD_REFERENCE = re.compile(r"(?:payload:)?([0-9a-f]{32})")
+# Characters of a compacted tool result kept in the history
+DIGEST_LENGTH = 300
+
+# History state of the actor turn being processed, for the agents to fetch payloads (see HistoryPlugin)
+active_history_state: ContextVar["HistoryState | None"] = ContextVar("active_history_state", default=None)
+
+
+async def read_history(get_state: Callable[[str], Awaitable[tuple[bool, Any]]]) -> ChatHistory:
+    """
+    Read a whole stored history, with get_state returning whether a state exists and its value.
+    The compacted tool results are restored from their payloads.
+    NOTE this is shared with the admin console, which reads the actor state from the store directly.
+    """
+    exists, head = await get_state(HEAD_STATE)
+    if not exists:
+        exists, state = await get_state(LEGACY_STATE)
+        return ChatHistory.model_validate(state) if exists else ChatHistory()
+
+    segments = await asyncio.gather(
+        *[get_state(SEGMENT_STATE.format(index=index)) for index in range(head["segments"])]
+    )
+    for index, (exists, _) in enumerate(segments):
+        if not exists:
+            raise KeyError(f"History segment {index} is missing")
+    messages = [message for _, segment in segments for message in segment]
+    await restore_payloads(messages, get_state)
+    return ChatHistory.model_validate(
+        {
+            "messages": messages,
+            "system_message": head.get("system_message"),
+        }
+    )
+
+
+def _payload_digests(messages: list[dict]) -> set[str]:
+    """Digests of the payloads referenced by stored messages."""
+    return {
+        item["metadata"][PAYLOAD_METADATA]
+        for message in messages
+        for item in message.get("items", [])
+        if PAYLOAD_METADATA in (item.get("metadata") or {})
+    }
+
+
+async def restore_payloads(
+    messages: list[dict], get_state: Callable[[str], Awaitable[tuple[bool, Any]]]
+) -> None:
+    """Put back their payload in the compacted tool results of stored messages, in place."""
+    digests = list(_payload_digests(messages))
+    states = await asyncio.gather(*[get_state(PAYLOAD_STATE.format(digest=digest)) for digest in digests])
+    payloads = {digest: payload for digest, (exists, payload) in zip(digests, states) if exists}
+    for message in messages:
+        for item in message.get("items", []):
+            metadata = item.get("metadata") or {}
+            if PAYLOAD_METADATA not in metadata:
+                continue
+            digest = metadata[PAYLOAD_METADATA]
+            if digest not in payloads:
+                logger.warning(f"Tool result payload {digest} is missing, its digest is kept")
+                continue
+            item["result"] = payloads[digest]
+            item["metadata"] = {key: value for key, value in metadata.items() if key != PAYLOAD_METADATA}
+
+
+class HistoryState:
+    """
+    Chat history of an actor, persisted as numbered segments of messages plus a small head.
+    Saving only writes the segments holding new messages and the head, so the cost of a save
+    does not grow with the conversation and no state item grows past a segment.
+
+    The history can be loaded as a window of its last segments, in which case the messages
+    before the window stay in the store and new messages are appended after the stored ones.
+    With a summarizer, those messages are summarized in the head, extending the summary as the
+    window moves, and the summary is shown in their place.
+
+    Large tool results can be compacted once consumed: the payload is stored once per actor under
+    its content hash and the result keeps a reference to it. The head lists the payloads referenced
+    by each segment, so payloads no segment references anymore are removed.
+    """
+
+    def __init__(
+        self,
+        state_manager: ActorStateManager,
+        segment_size: int,
+        summarizer: Callable[[str, list[ChatMessageContent]], Awaitable[str]] | None = None,
+    ):
+        self._state_manager = state_manager
+        self.segment_size = segment_size
+        self._summarizer = summarizer
+        # Stored segments, and persisted messages with the last of them, to detect appends
+        self._segments = 0
+        self._saved = 0
+        self._last_saved: ChatMessageContent | None = None
+        self._legacy = False
+        # Messages standing for the stored messages before the window, and the count of those
+        self._prefix: list[ChatMessageContent] = []
+        self._offset = 0
+        # Summary of the stored messages after the first one and before "count"
+        self._summary: dict | None = None
+        # Digests of the payloads referenced by each stored segment, by segment index (as str)
+        self._payloads: dict[str, list[str]] = {}
+
+    @property
+    def is_windowed(self) -> bool:
+        return self._offset > 0
+
+    async def load(self, window: int = 0) -> ChatHistory:
+        """
+        Load the stored history, or an empty one.
+        With a window, only the first message and the last `window` segments are loaded, with a
+        system note standing for the messages left out in between: their summary, or their count.
+        """
+        exists, head = await self._state_manager.try_get_state(HEAD_STATE)
+        if not exists:
+            exists, state = await self._state_manager.try_get_state(LEGACY_STATE)
+            if not exists:
+                return ChatHistory()
+            self._legacy = True
+            return ChatHistory.model_validate(state)
+
+        # Stored segments keep their size, even if the setting changed since
+        self.segment_size = head["segment_size"]
+        self._segments = head["segments"]
+        self._summary = head.get("summary")
+        self._payloads = head.get("payloads", {})
+        # Segment 0 is read for the first message anyway, so a window must skip more than it
+        first = self._segments - window if window > 0 else 0
+        if first <= 1:
+            first = 0
+
+        indexes = ([0] if first > 0 else []) + list(range(first, self._segments))
+        loaded = dict(zip(indexes, await asyncio.gather(*[self._load_segment(index) for index in indexes])))
+        # Tool results at the start of the window would miss the assistant message calling the tools,
+        # which the model rejects, so the window is extended back to a segment starting otherwise
+        while first > 1 and loaded[first] and loaded[first][0]["role"] == AuthorRole.TOOL:
+            first -= 1
+            loaded[first] = await self._load_segment(first)
+        if first == 1:
+            first = 0
+
+        segments = [loaded[index] for index in range(first, self._segments)]
+        if first > 0:
+            segments.insert(0, loaded[0][:1])
+        history = ChatHistory.model_validate(
+            {
+                "messages": [message for segment in segments for message in segment],
+                "system_message": head.get("system_message"),
+            }
+        )
+
+        self._offset = first * self.segment_size
+        self._prefix = []
+        if first > 0:
+            summary = await self._summarize(loaded)
+            note = f"{self._offset - 1} earlier messages of this conversation are not shown."
+            if summary:
+                note = f"{note[:-1]}, they are summarized as follows.\n{summary}"
+            # The first message usually states the request the conversation is about
+            history.messages.insert(
+                1, ChatMessageContent(role=AuthorRole.SYSTEM, name=HISTORY_NOTE_NAME, content=note)
+            )
+            self._prefix = history.messages[:2]
+        self._mark_saved(history)
+        logger.debug(f"Loaded history messages {self._offset} to {head['count']} of {head['count']}")
+        return history
+
+    async def read(self) -> ChatHistory:
+        """Read the whole stored history, without changing what is loaded."""
+        return await read_history(self._state_manager.try_get_state)
+
+    async def _summarize(self, loaded: dict[int, list[dict]]) -> str | None:
+        """
+        Summarize the stored messages before the window, after the first one, extending the stored
+        summary with the messages it does not cover yet. Returns None when there is no summary.
+        """
+        summary = self._summary
+        if summary is not None and summary["count"] == self._offset:
+            return summary["text"]
+        if self._summarizer is None:
+            return None
+        # A summary going past the window (extended back since) would repeat the messages shown
+        if summary is None or summary["count"] > self._offset:
+            summary = {"count": 1, "text": ""}
+
+        size = self.segment_size
+        indexes = range(summary["count"] // size, self._offset // size)
+        segments = await asyncio.gather(
+            *[self._load_segment(index) for index in indexes if index not in loaded]
+        )
+        missing = iter(segments)
+        messages = [
+            ChatMessageContent.model_validate(message)
+            for index in indexes
+            for message in (loaded[index] if index in loaded else next(missing))
+        ][summary["count"] % size :]
+        try:
+            text = await self._summarizer(summary["text"], messages)
+        except Exception as e:
+            logger.warning(f"Could not summarize the history before the window: {e}", exc_info=True)
+            return None
+
+        # Stored with the head on the next save
+        self._summary = {"count": self._offset, "text": text}
+        logger.debug(f"Summarized history messages {summary['count']} to {self._offset}")
+        return text
+
+    async def _load_segment(self, index: int) -> list[dict]:
+        exists, segment = await self._state_manager.try_get_state(SEGMENT_STATE.format(index=index))
+        if not exists:
+            raise KeyError(f"History segment {index} is missing")
+        return segment
+
+    async def save(self, history: ChatHistory) -> None:
+        """
+        Save the messages added since the last save, rewriting the history loaded in memory only
+        when it was changed other than by appending messages.
+        """
+        messages = history.messages
+        prefix = len(self._prefix)
+        if prefix and (
+            len(messages) < prefix
+            or any(message is not loaded for message, loaded in zip(messages, self._prefix))
+        ):
+            # The history was replaced, so it is the whole conversation from now on
+            logger.warning("Windowed history was replaced, the messages before the window are dropped")
+            self._prefix = []
+            self._offset = 0
+            self._saved = 0
+            self._summary = None
+            prefix = 0
+
+        rewrite = (
+            self._legacy
+            or len(messages) < self._saved
+            or (self._saved > prefix and messages[self._saved - 1] is not self._last_saved)
+        )
+        start = prefix if rewrite else self._saved
+        if start == len(messages) and self._segments > 0:
+            return
+
+        # Position in the store of the messages in memory, after the window prefix
+        size = self.segment_size
+        shift = self._offset - prefix
+        count = len(messages) + shift
+        segments = max(1, -(-count // size))
+        payloads = dict(self._payloads)
+        # The last stored segment may be partial, so it is written again with the new messages
+        for index in range((start + shift) // size, segments):
+            lower = max(index * size - shift, prefix)
+            # Unset fields are left out, they are restored as defaults when loading
+            segment = [
+                message.model_dump(exclude_none=True)
+                for message in messages[lower : (index + 1) * size - shift]
+            ]
+            await self._state_manager.set_state(SEGMENT_STATE.format(index=index), segment)
+            payloads[str(index)] = sorted(_payload_digests(segment))
+        for index in range(segments, self._segments):
+            await self._state_manager.try_remove_state(SEGMENT_STATE.format(index=index))
+            payloads.pop(str(index), None)
+        payloads = {index: digests for index, digests in payloads.items() if digests}
+        # Payloads are shared by identical results, so they are removed with their last reference
+        referenced = {digest for digests in payloads.values() for digest in digests}
+        for digest in {digest for digests in self._payloads.values() for digest in digests} - referenced:
+            await self._state_manager.try_remove_state(PAYLOAD_STATE.format(digest=digest))
+        await self._state_manager.set_state(
+            HEAD_STATE,
+            {
+                "segment_size": size,
+                "segments": segments,
+                "count": count,
+                # NOTE assigning the messages of a ChatHistory drops its system_message attribute
+                "system_message": getattr(history, "system_message", None),
+                "summary": self._summary,
+                "payloads": payloads,
+            },
+        )
+        if self._legacy:
+            await self._state_manager.try_remove_state(LEGACY_STATE)
+        await self._state_manager.save_state()
+
+        logger.debug(f"Saved history messages {start + shift} to {count} in segments {(start + shift) // size} to {segments - 1}")
+        self._legacy = False
+        self._segments = segments
+        self._payloads = payloads
+        self._mark_saved(history)
+
+    async def compact_tool_results(self, history: ChatHistory, start: int, max_length: int) -> int:
+        """
+        Move the tool results longer than max_length, in the messages from start, out of the history.
+        Each payload is stored once under its content hash, and the result is replaced by the
+        reference with the beginning of the payload. Returns the number of compacted results.
+        """
+        compacted = 0
+        for position in range(max(start, len(self._prefix)), len(history.messages)):
+            message = history.messages[position]
+            for index, item in enumerate(message.items):
+                if not isinstance(item, FunctionResultContent) or PAYLOAD_METADATA in item.metadata:
+                    continue
+                payload = str(item.result)
+                if len(payload) <= max_length:
+                    continue
+
+                digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+                # Identical payloads (e.g. the same catalog listing) share the stored copy
+                await self._state_manager.try_add_state(PAYLOAD_STATE.format(digest=digest), payload)
+                message.items[index] = item.model_copy(
+                    update={
+                        "result": f"[{len(payload)} characters stored as payload:{digest}, get_tool_result "
+                        f"gives the whole result, which begins with] {payload[:DIGEST_LENGTH]}...",
+                        "metadata": {**item.metadata, PAYLOAD_METADATA: digest},
+                    }
+                )
+                compacted += 1
+                self._mark_changed(history, position)
+
+        if compacted:
+            logger.debug(f"Compacted {compacted} tool results")
+        return compacted
+
+    async def get_payload(self, reference: str) -> str | None:
+        """Get a tool result moved out of the history from its reference, None if there is none."""
+        match = PAYLOAD_REFERENCE.search(reference)
+        if match is None:
+            return None
+        exists, payload = await self._state_manager.try_get_state(PAYLOAD_STATE.format(digest=match.group(1)))
+        return payload if exists else None
+
+    def _mark_changed(self, history: ChatHistory, position: int) -> None:
+        # Messages changed in place are not detected by save, so they are saved again from there
+        if position < self._saved:
+            self._saved = position
+            self._last_saved = history.messages[position - 1] if position > 0 else None
+
+    def _mark_saved(self, history: ChatHistory) -> None:
+        self._saved = len(history.messages)
+        self._last_saved = history.messages[-1] if history.messages else None
@@ -1,9 +1,10 @@
 from dapr.actor import ActorInterface, Actor, actormethod
 import logging
 
-from semantic_kernel.contents.chat_history import ChatHistory
 from order.order_team import processing_team
 
+from actors.history_actor import HistoryActorMixin
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Ensure logging level is set as required
 
@@ -23,30 +24,16 @@ class ProcessingActorInterface(ActorInterface):
     async def get_history(self) -> dict: ...
 
 
-class ProcessingActor(Actor, ProcessingActorInterface):
-
-    history: ChatHistory
+# NOTE the history methods (get_history included) come from HistoryActorMixin
+class ProcessingActor(Actor, HistoryActorMixin, ProcessingActorInterface):
 
     async def _on_activate(self) -> None:
         logger.info(f"Activating actor {self.id}")
-        # Load state on activation
-        # NOTE: it is KEY to use "try_get_state" instead of "get_state"
-        (exists, state) = await self._state_manager.try_get_state("history")
-        if exists:
-            self.history = ChatHistory.model_validate(state)
-            logger.debug(f"Loaded existing history state for actor {self.id}")
-        else:
-            self.history = ChatHistory()
-            logger.debug(
-                f"No history state found for actor {self.id}. Created new history."
-            )
+        # NOTE the history is only loaded by the methods that need it, see _load_history
+        self._init_history_state()
 
         logger.info(f"Actor {self.id} activated successfully")
 
-    async def get_history(self) -> dict:
-        logger.debug(f"Getting conversation history for actor {self.id}")
-        return self.history.model_dump()
-
     async def process(self, input_message: str) -> None:
         """
         Process the input message using the agent and return the response.
@@ -54,6 +41,8 @@ class ProcessingActor(Actor, ProcessingActorInterface):
         """
         try:
             logger.info(f"Invoking actor {self.id} with input message: {input_message}")
+            await self._load_history()
+            start = len(self.history.messages)
             self.history.add_user_message(input_message)
 
             async for result in processing_team.invoke(history=self.history):
@@ -62,19 +51,11 @@ class ProcessingActor(Actor, ProcessingActorInterface):
                 )
 
                 await self._save_history()
+
+            await self._compact_tool_results(start)
+            await self._save_history()
         except Exception as e:
             logger.error(
                 f"Error occurred in actor {self.id}: {e}", exc_info=True
             )
             raise
-
-    async def _save_history(self) -> None:
-        """
-        Save the conversation history to the actor's state.
-        This is called automatically when the actor is deactivated.
-        """
-        logger.debug(f"Saving conversation history for actor {self.id}")
-        dumped_history = self.history.model_dump()
-        await self._state_manager.set_state("history", dumped_history)
-        await self._state_manager.save_state()
-        logger.info(f"State saved successfully for actor {self.id}")
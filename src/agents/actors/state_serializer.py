@@ -0,0 +1,147 @@
+import base64
+import enum
+import logging
+import zlib
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any
+
+from dapr.serializers import DefaultJSONSerializer, Serializer
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+# Compact values are stored as JSON strings: this marker, then the codec version byte and
+# the encoded value, in base64 as the actor state API only takes JSON values
+COMPACT_MARKER = "~s:"
+# Values smaller than this, once packed, are not worth compressing
+MIN_COMPRESS_SIZE = 256
+
+
+class StateCodec:
+    """
+    Encoding of the msgpack representation of actor state values (e.g. a compression),
+    identified in the stored values by its version byte.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        name: str,
+        encode: Callable[[bytes], bytes],
+        decode: Callable[[bytes], bytes],
+    ):
+        self.version = version
+        self.name = name
+        self.encode = encode
+        self.decode = decode
+
+
+def _to_primitive(obj: Any) -> Any:
+    # Values of model_dump() that msgpack does not support, encoded as the JSON serializer does
+    if isinstance(obj, enum.Enum):
+        return obj.value
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} in actor state")
+
+
+def _pack(value: Any) -> bytes:
+    return msgpack.packb(value, default=_to_primitive)
+
+
+def _unpack(data: bytes) -> Any:
+    return msgpack.unpackb(data)
+
+
+def _zstd_compress(data: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+def _identity(data: bytes) -> bytes:
+    return data
+
+
+# Stored values keep their version, so existing versions must stay readable
+CODECS: dict[int, StateCodec] = {
+    codec.version: codec
+    for codec in (
+        StateCodec(1, "msgpack", _identity, _identity),
+        StateCodec(2, "msgpack+zstd", _zstd_compress, _zstd_decompress),
+        StateCodec(3, "msgpack+zlib", zlib.compress, zlib.decompress),
+    )
+}
+
+
+class CompactStateSerializer(Serializer):
+    """
+    Actor state serializer storing values with a compact binary codec.
+    Values written as JSON by the default serializer are still read, so existing state keeps
+    working and is converted as it is written again.
+
+    Args:
+        codec (str): The name of the codec used for new values, "json" to keep the default serializer.
+    """
+
+    def __init__(self, codec: str = "msgpack+zstd"):
+        self._json = DefaultJSONSerializer()
+        self._codec = self._compressed = None
+        if codec != "json":
+            if msgpack is None:
+                logger.warning("msgpack is not installed, actor state is stored as JSON")
+            else:
+                if codec == "msgpack+zstd" and zstandard is None:
+                    logger.warning("zstandard is not installed, actor state is compressed with zlib")
+                    codec = "msgpack+zlib"
+                codecs = {c.name: c for c in CODECS.values()}
+                if codec not in codecs:
+                    raise ValueError(f"Unknown actor state codec: {codec}")
+                self._codec = codecs["msgpack"]
+                self._compressed = codecs[codec]
+
+    def serialize(
+        self, obj: object, custom_hook: Callable[[object], bytes] | None = None
+    ) -> bytes:
+        if self._codec is None or callable(custom_hook):
+            return self._json.serialize(obj, custom_hook)
+
+        codec = self._codec
+        data = _pack(obj)
+        if len(data) >= MIN_COMPRESS_SIZE and self._compressed is not codec:
+            compressed = self._compressed.encode(data)
+            if len(compressed) < len(data):
+                codec, data = self._compressed, compressed
+        encoded = base64.b64encode(bytes([codec.version]) + data).decode("ascii")
+        return f'"{COMPACT_MARKER}{encoded}"'.encode("ascii")
+
+    def deserialize(
+        self,
+        data: bytes,
+        data_type: type | None = object,
+        custom_hook: Callable[[bytes], object] | None = None,
+    ) -> Any:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        marker = b'"' + COMPACT_MARKER.encode("ascii")
+        if not data.startswith(marker):
+            return self._json.deserialize(data, data_type, custom_hook)
+
+        payload = base64.b64decode(data[len(marker) : data.rindex(b'"')])
+        codec = CODECS.get(payload[0])
+        if codec is None:
+            raise ValueError(f"Unknown actor state codec version: {payload[0]}")
+        obj = _unpack(codec.decode(payload[1:]))
+        return custom_hook(obj) if callable(custom_hook) else obj
@@ -1,13 +1,18 @@
+import asyncio
 from dapr.actor import ActorInterface, Actor, actormethod
 import logging
 
-from semantic_kernel.contents.chat_history import ChatHistory
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
 from semantic_kernel.agents import Agent
 
-from utils.notify import notify
+from utils.config import config
+from utils.notify import NotificationStream, notify
+from order.chat.chat_user import chat_user_agent
 from order.order_team import assistant_team
 
+from actors.history_actor import HistoryActorMixin
+
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)  # Ensure logging level is set as required
 
@@ -22,6 +27,9 @@ class UserActorInterface(ActorInterface):
     @actormethod(name="ask")
     async def ask(self, input_message: str) -> list[dict]: ...
 
+    @actormethod(name="ask_stream")
+    async def ask_stream(self, request: dict) -> list[dict]: ...
+
     @actormethod(name="get_history")
     async def get_history(self) -> dict: ...
 
@@ -35,30 +43,16 @@ class UserActorInterface(ActorInterface):
     async def notify(self, message: str | dict) -> None: ...
 
 
-class UserActor(Actor, UserActorInterface):
-
-    history: ChatHistory
+# NOTE the history methods (get_history included) come from HistoryActorMixin
+class UserActor(Actor, HistoryActorMixin, UserActorInterface):
 
     async def _on_activate(self) -> None:
         logger.info(f"Activating actor {self.id}")
-        # Load state on activation
-        # NOTE: it is KEY to use "try_get_state" instead of "get_state"
-        (exists, state) = await self._state_manager.try_get_state("history")
-        if exists:
-            self.history = ChatHistory.model_validate(state)
-            logger.debug(f"Loaded existing history state for actor {self.id}")
-        else:
-            self.history = ChatHistory()
-            logger.debug(
-                f"No history state found for actor {self.id}. Created new history."
-            )
+        # NOTE the history is only loaded by the methods that need it, see _load_history
+        self._init_history_state()
 
         logger.info(f"Actor {self.id} activated successfully")
 
-    async def get_history(self) -> dict:
-        logger.debug(f"Getting conversation history for actor {self.id}")
-        return self.history.model_dump()
-
     async def ask(self, input_message: str) -> list[dict]:
         """
         Ask the agent a question and return the response.
@@ -74,11 +68,73 @@ class UserActor(Actor, UserActorInterface):
 
         return results
 
+    async def ask_stream(self, request: dict) -> list[dict]:
+        """
+        Ask the agent a question, streaming each agent answer as it is generated to the conversation
+        the request comes from: {"message": ..., "conversation_id": ...}.
+        Returns the answers as in ask, each with the "stream_id" metadata of its stream (when it started),
+        so the caller can send them as the final messages of the streams.
+        """
+        input_message = request["message"]
+        conversation_id = request["conversation_id"]
+        await self._load_history()
+        start = len(self.history.messages) + 1
+        try:
+            logger.info(f"Streaming actor {self.id} answer to input message: {input_message}")
+            self.history.add_user_message(input_message)
+
+            # One stream per agent answer
+            streams: list[tuple[str, NotificationStream]] = []
+            async for chunk in assistant_team.invoke_stream(history=self.history):
+                # The PAUSE of the user agent is not shown, as in ask
+                if not chunk.content or chunk.name == chat_user_agent.name:
+                    continue
+                if not streams or streams[-1][0] != chunk.name:
+                    streams.append(
+                        (
+                            chunk.name,
+                            NotificationStream(
+                                conversation_id,
+                                from_user=chunk.name or "assistant",
+                                interval=config.NOTIFY_STREAM_INTERVAL,
+                            ),
+                        )
+                    )
+                streams[-1][1].append(chunk.content)
+
+            stream_ids = [(name, await stream.finish()) for name, stream in streams]
+
+            await self._compact_tool_results(start)
+            await self._save_history()
+        except Exception as e:
+            logger.error(
+                f"Error occurred in ask_stream for actor {self.id}: {e}", exc_info=True
+            )
+            raise
+
+        results = []
+        for message in self.history.messages[start:]:
+            if message.role != AuthorRole.ASSISTANT or not message.content or "PAUSE" in message.content:
+                continue
+            result = message.model_dump()
+            # Streams were started in the order of the answers
+            stream_index = next(
+                (index for index, (name, _) in enumerate(stream_ids) if name == message.name), None
+            )
+            if stream_index is not None:
+                _, stream_id = stream_ids.pop(stream_index)
+                if stream_id is not None:
+                    result["metadata"] = {**result["metadata"], "stream_id": stream_id}
+            results.append(result)
+        return results
+
     async def _invoke_agent(
         self, agent: Agent, input_message: str
     ) -> list[ChatMessageContent]:
         try:
             logger.info(f"Invoking actor {self.id} with input message: {input_message}")
+            await self._load_history()
+            start = len(self.history.messages)
             self.history.add_user_message(input_message)
             results: list[ChatMessageContent] = []
 
@@ -89,6 +145,7 @@ class UserActor(Actor, UserActorInterface):
                 results.append(result)
 
             # TODO move under for loop to save each message as it is received
+            await self._compact_tool_results(start)
             await self._save_history()
 
             return results
@@ -127,21 +184,11 @@ class UserActor(Actor, UserActorInterface):
             logger.info(f"Sending notification to conversation {conversation_id}")
             # Send the message to the user
             try:
-                notify(conversation_id, message, from_user="process_order")
+                # NOTE the post is blocking, so it runs in a thread to keep the other actors responsive
+                await asyncio.to_thread(notify, conversation_id, message, from_user="process_order")
             except Exception as e:
                 logger.error(f"Failed to send notification for actor {self.id}: {e}", exc_info=True)
         else:
             logger.warning(
                 f"Cannot send notification to actor {self.id} because no conversation ID is registered."
             )
-
-    async def _save_history(self) -> None:
-        """
-        Save the conversation history to the actor's state.
-        This is called automatically when the actor is deactivated.
-        """
-        logger.debug(f"Saving conversation history for actor {self.id}")
-        dumped_history = self.history.model_dump()
-        await self._state_manager.set_state("history", dumped_history)
-        await self._state_manager.save_state()
-        logger.info(f"State saved successfully for actor {self.id}")
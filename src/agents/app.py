@@ -1,3 +1,4 @@
+import asyncio
 from dapr.clients import DaprActorHttpClient
 from dapr.serializers import DefaultJSONSerializer
 from opentelemetry.propagate import inject
@@ -7,10 +8,11 @@ from dapr.ext.fastapi import DaprApp, DaprActor
 from dapr.actor import ActorProxy, ActorId
 from contextlib import asynccontextmanager
 from actors.processing_actor import ProcessingActor, ProcessingActorInterface
+from actors.state_serializer import CompactStateSerializer
 from actors.user_actor import UserActor, UserActorInterface
 from fastapi import FastAPI, Request
 from utils.config import config
-from utils.store import DaprActorStore
+from utils.store import DaprActorStore, close_data_stores
 from cloudevents.http import from_http
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
 
@@ -19,15 +21,24 @@ logger = logging.getLogger(__name__)
 tracing.set_up_logging()
 
 actor: DaprActor = None
+# Notification fan-outs still running, referenced so they are not garbage collected
+notification_tasks: set[asyncio.Task] = set()
 
 
 # Register actor when fastapi starts up
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Registering actor")
-    await actor.register_actor(ProcessingActor)
-    await actor.register_actor(UserActor)
+    # Actor state is stored with a compact codec, existing JSON state is still read
+    state_serializer = CompactStateSerializer(config.ACTOR_STATE_CODEC)
+    await actor.register_actor(ProcessingActor, state_serializer=state_serializer)
+    await actor.register_actor(UserActor, state_serializer=state_serializer)
     yield
+    # Let the pending notifications go out before shutting down
+    if notification_tasks:
+        await asyncio.wait(notification_tasks, timeout=30)
+    # Release the shared data store connections
+    await close_data_stores()
 
 
 # Create fastapi and register dapr and actors
@@ -54,6 +65,50 @@ dap_otel_client = DaprActorHttpClient(
 FastAPIInstrumentor.instrument_app(app)
 
 
+async def notify_users(message: str) -> None:
+    """
+    Notify the users of an order event, with at most NOTIFY_CONCURRENCY notifications in flight.
+    A failed notification is logged and does not affect the others.
+    """
+    # Determine user IDs for notification
+    if config.NOTIFY_USER_IDS and len(config.NOTIFY_USER_IDS) > 0:
+        user_ids = [user_id.strip() for user_id in config.NOTIFY_USER_IDS]
+        logger.info(f"Sending notification to users {user_ids}")
+    else:
+        # TODO evaluate whether to use Cosmos DB for this
+        user_ids = await asyncio.to_thread(state_store.list_actors, "UserActor")
+        logger.info(f"Notification user IDs from state store: {user_ids}")
+
+    semaphore = asyncio.Semaphore(config.NOTIFY_CONCURRENCY)
+
+    async def notify_user(user_id: str) -> None:
+        async with semaphore:
+            logger.info(f"Sending notification to user {user_id}")
+            user_proxy: UserActorInterface = ActorProxy(
+                client=dap_otel_client,
+                actor_type="UserActor",
+                actor_id=ActorId(user_id),
+                actor_interface=UserActorInterface,
+                message_serializer=default_serializer
+            )
+            await user_proxy.notify(message)
+
+    user_ids = [user_id for user_id in user_ids if user_id]
+    results = await asyncio.gather(
+        *[notify_user(user_id) for user_id in user_ids], return_exceptions=True
+    )
+    for user_id, result in zip(user_ids, results):
+        if isinstance(result, Exception):
+            logger.error(f"Failed to notify user {user_id}: {result}")
+
+
+def notification_done(task: asyncio.Task) -> None:
+    notification_tasks.discard(task)
+    # Failures outside the notifications themselves (e.g. listing the users) end the task
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Error notifying users: {task.exception()}", exc_info=task.exception())
+
+
 @dapr_app.subscribe(pubsub=config.PUBSUB_NAME, topic=config.TOPIC_NAME)
 async def process_new_order(req: Request):
     """
@@ -79,27 +134,12 @@ async def process_new_order(req: Request):
         )
         await proxy.process(f"Process order {order_id} with data\n\n{data}")
 
-        # TODO evaluate whether to use Cosmos DB for this
         logger.info(f"Order {order_id} processed successfully")
-        # Determine user IDs for notification
-        if config.NOTIFY_USER_IDS and len(config.NOTIFY_USER_IDS) > 0:
-            user_ids = [user_id.strip() for user_id in config.NOTIFY_USER_IDS]
-            logger.info(f"Sending notification to users {user_ids}")
-        else:
-            user_ids = state_store.list_actors("UserActor")
-            logger.info(f"Notification user IDs from state store: {user_ids}")
-
-        for user_id in user_ids:
-            if user_id:
-                logger.info(f"Sending notification to user {user_id}")
-            user_proxy: UserActorInterface = ActorProxy(
-                client=dap_otel_client,
-                actor_type="UserActor",
-                actor_id=ActorId(user_id),
-                actor_interface=UserActorInterface,
-                message_serializer=default_serializer
-            )
-            await user_proxy.notify(f"New order {order_id} received and processed", from_user="order_team")
+
+        # NOTE users are notified in the background, so the order event is acknowledged right away
+        task = asyncio.create_task(notify_users(f"New order {order_id} received and processed"))
+        notification_tasks.add(task)
+        task.add_done_callback(notification_done)
 
         return {"status": "SUCCESS"}
     except Exception as e:
@@ -2,6 +2,7 @@ from semantic_kernel.agents import ChatCompletionAgent
 from utils.config import get_azure_openai_client
 
 from order.plugins.fulfillment_plugin import FulfillmentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 chat_fulfillment_agent = ChatCompletionAgent(
@@ -169,5 +170,5 @@ For backorder information, provide:
 Remember, your goal is to provide helpful assistance with delivery and fulfillment that ensures customers understand their order status and helps resolve any issues or requests related to order delivery.
 """,
     service=get_azure_openai_client(),
-    plugins=[FulfillmentPlugin()],
+    plugins=[FulfillmentPlugin(), HistoryPlugin()],
 )
@@ -2,6 +2,7 @@ from semantic_kernel.agents import ChatCompletionAgent
 from utils.config import get_azure_openai_client
 
 from order.plugins.pricing_plugin import PricingAgentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 chat_pricing_agent = ChatCompletionAgent(
@@ -57,6 +58,11 @@ You have access to the following tools that you should use when appropriate:
    - Parameters: List of line item total amounts
    - Returns: Order total calculation details
 
+5. `calculate_order_prices(lines, customer_id)` - Calculates final pricing for all order lines at once
+   - Use when: Recalculating prices for several items of an order (preferred over one `calculate_final_price` call per SKU)
+   - Parameters: List of lines with sku, quantity and standard unit_price, and the customer ID
+   - Returns: Detailed price calculation for each line, line totals and order subtotal
+
 ## RESPONSE STRUCTURE
 
 When responding to pricing inquiries or making modifications, structure your responses clearly:
@@ -119,5 +125,5 @@ For pricing modifications, document:
 Remember, your goal is to provide helpful, accurate, and transparent pricing assistance that helps users understand their order pricing and supports legitimate modifications when needed.
 """,
     service=get_azure_openai_client(),
-    plugins=[PricingAgentPlugin()],
+    plugins=[PricingAgentPlugin(), HistoryPlugin()],
 )
@@ -1,6 +1,7 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from utils.config import get_azure_openai_client
 from order.plugins.substitution_plugin import SubstitutionAgentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 chat_substitution_agent = ChatCompletionAgent(
     id="substitution_agent",
@@ -117,5 +118,5 @@ For substitution modifications, document:
 Remember, your goal is to provide helpful assistance with substitutions that ensures customers understand why changes were made and helps them get the best alternative products when needed.
 """,
     service=get_azure_openai_client(),
-    plugins=[SubstitutionAgentPlugin()],
+    plugins=[SubstitutionAgentPlugin(), HistoryPlugin()],
 )
@@ -2,6 +2,7 @@ from semantic_kernel.agents import ChatCompletionAgent
 from utils.config import get_azure_openai_client
 
 from order.plugins.validation_plugin import ValidationPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 chat_validator_agent = ChatCompletionAgent(
@@ -85,5 +86,5 @@ For inventory or availability issues, provide specific details:
 Remember, your goal is to provide helpful and accurate assistance with existing orders, making the customer feel supported throughout their post-purchase experience.
 """,
     service=get_azure_openai_client(),
-    plugins=[ValidationPlugin()],
+    plugins=[ValidationPlugin(), HistoryPlugin()],
 )
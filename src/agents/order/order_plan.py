@@ -0,0 +1,166 @@
+import ast
+import json
+import logging
+from typing import Any
+
+from sk_ext.planning_strategy import TeamPlan, TeamPlanStep
+
+logger = logging.getLogger(__name__)
+
+# Orders larger than this are left to the planner, which can split the work differently
+MAX_ORDER_LINES = 50
+
+
+# Canonical plan for well-formed orders, following the core workflow rules of the planner:
+# validation first, substitution before pricing, fulfillment last.
+# Validation and substitution only read the catalog and inventory, so they run concurrently;
+# pricing needs the substitutions (it prices the available quantities), fulfillment needs all.
+ORDER_PLAN = TeamPlan(
+    plan=[
+        TeamPlanStep(
+            agent_id="validator_agent",
+            instructions=(
+                "Validate order {order_id} for customer {customer_id}. Check that all the SKUs "
+                "({skus}) exist and that the requested quantities are available in inventory. "
+                "Report any invalid SKU or inventory shortage."
+            ),
+            depends_on=[],
+        ),
+        TeamPlanStep(
+            agent_id="substitution_agent",
+            instructions=(
+                "For order {order_id}, check the inventory availability of the SKUs ({skus}) "
+                "for the requested quantities. For any SKU with insufficient quantity, find a "
+                "substitute with enough quantity, checking substitutes of substitutes if needed, "
+                "and note any shortage that cannot be covered."
+            ),
+            depends_on=[],
+        ),
+        TeamPlanStep(
+            agent_id="pricing_agent",
+            instructions=(
+                "Price all the {line_count} lines of order {order_id} for customer {customer_id}, "
+                "applying customer-specific pricing and quantity discounts. Take into account the "
+                "substitutions and available quantities found by the substitution_agent."
+            ),
+            depends_on=[1],
+        ),
+        TeamPlanStep(
+            agent_id="fulfillment_agent",
+            instructions=(
+                "Create and save the delivery schedule of order {order_id} from the validated, "
+                "substituted and priced lines. Select facilities based on availability, consider "
+                "split shipments, record backorders for any shortage and finalize the order."
+            ),
+            depends_on=[0, 1, 2],
+        ),
+    ]
+)
+
+
+def match_order_inquiry(inquiry: str) -> dict[str, Any] | None:
+    """
+    Recognize a well-formed order processing inquiry, as sent by the order pubsub handler.
+    Returns the ORDER_PLAN template arguments, or None for anything unusual.
+    """
+    if not inquiry.startswith("Process order"):
+        return None
+
+    data = _parse_order_data(inquiry)
+    if not isinstance(data, dict):
+        return None
+
+    # Orders coming from the logic apps wrap the order in "input"
+    order = data.get("input", data)
+    if not isinstance(order, dict):
+        return None
+
+    customer_id = order.get("customerId")
+    lines = order.get("order")
+    if not isinstance(customer_id, str) or not customer_id:
+        return None
+    if not isinstance(lines, list) or not 0 < len(lines) <= MAX_ORDER_LINES:
+        return None
+
+    skus = []
+    for line in lines:
+        if not isinstance(line, dict) or not isinstance(line.get("sku"), str):
+            return None
+        quantity = line.get("quantity")
+        unit_price = line.get("unit_price")
+        if not isinstance(quantity, int) or quantity < 1:
+            return None
+        if not isinstance(unit_price, (int, float)) or unit_price < 0:
+            return None
+        skus.append(line["sku"])
+
+    return {
+        "order_id": data.get("order_id", "(unknown)"),
+        "customer_id": customer_id,
+        "skus": ", ".join(dict.fromkeys(skus)),
+        "line_count": len(lines),
+    }
+
+
+def order_plan_fingerprint(inquiry: str) -> tuple[dict[str, Any], dict[str, Any]] | None:
+    """
+    Fingerprint an order processing inquiry for the plan cache.
+    Returns the order features, which decide whether two orders can share a plan, and the id values
+    (order, customer, SKUs) the cached instructions are formatted with.
+    Returns None when the plan must not be cached.
+    """
+    if not inquiry.startswith("Process order"):
+        return None
+
+    data = _parse_order_data(inquiry)
+    if not isinstance(data, dict):
+        return None
+    order = data.get("input", data)
+    if not isinstance(order, dict) or not isinstance(order.get("order"), list):
+        return None
+    lines = order["order"]
+
+    values: dict[str, Any] = {
+        "order_id": data.get("order_id", ""),
+        "customer_id": order.get("customerId", ""),
+    }
+    # Anomalies are part of the fingerprint, with their position, as the plan handles them
+    invalid_prices = []
+    for index, line in enumerate(lines):
+        if not isinstance(line, dict) or not isinstance(line.get("sku"), str):
+            return None
+        unit_price = line.get("unit_price")
+        if not isinstance(unit_price, (int, float)) or unit_price < 0:
+            invalid_prices.append(index)
+        values[f"sku_{index}"] = line["sku"]
+
+    skus = [line["sku"] for line in lines]
+    features = {
+        # NOTE quantities are not templated, as numbers cannot be told apart in the instructions,
+        # so a plan is only shared by orders of the same quantities (invalid ones included)
+        "quantities": [line.get("quantity") for line in lines],
+        "has_customer": bool(values["customer_id"]),
+        "line_count": len(lines),
+        # Which lines repeat an earlier SKU
+        "repeated_skus": [index for index, sku in enumerate(skus) if sku in skus[:index]],
+        "invalid_prices": invalid_prices,
+    }
+    return features, values
+
+
+def _parse_order_data(inquiry: str) -> Any:
+    # The order data follows the inquiry text, as JSON or as a Python dict representation
+    start = inquiry.find("{")
+    if start < 0:
+        return None
+
+    raw = inquiry[start:]
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        pass
+    try:
+        return ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        logger.debug("Could not parse the order data of the inquiry")
+        return None
@@ -1,13 +1,21 @@
 
 from semantic_kernel.functions import KernelFunctionFromPrompt
+from sk_ext.debug_trace import DebugTraceSink
 from sk_ext.feedback_strategy import KernelFunctionFeedbackStrategy
+from sk_ext.history_reducer import TokenBudgetHistoryReducer
 from sk_ext.planned_team import PlannedTeam
-from sk_ext.planning_strategy import DefaultPlanningStrategy
+from sk_ext.planning_strategy import (
+    CachedPlanningStrategy,
+    DefaultPlanningStrategy,
+    RuleBasedPlanningStrategy,
+)
 from sk_ext.speaker_election_strategy import SpeakerElectionStrategy
+from sk_ext.summary_strategy import KernelFunctionSummaryStrategy
 from sk_ext.team import Team
 from sk_ext.termination_strategy import UserInputRequiredTerminationStrategy
 from utils.config import create_kernel, config
 
+from .order_plan import ORDER_PLAN, match_order_inquiry, order_plan_fingerprint
 from .processing.fulfillment_agent import fulfillment_agent
 from .processing.price_agent import pricing_agent
 from .processing.substitution_agent import substitution_agent
@@ -24,6 +32,19 @@ from .chat.chat_greeter_agent import chat_greeter_agent
 kernel = create_kernel()
 planning_kernel = create_kernel(config.PLANNING_MODEL)
 
+order_planner = DefaultPlanningStrategy(
+    kernel=planning_kernel,
+    include_tools_descriptions=True,
+    history_reducer=TokenBudgetHistoryReducer(max_tokens=config.ORCHESTRATION_HISTORY_MAX_TOKENS),
+)
+if config.PLAN_CACHE_MAX_PLANS > 0:
+    # NOTE orders differing only in their ids and quantities reuse the plan of the planner model
+    order_planner = CachedPlanningStrategy(
+        inner=order_planner,
+        fingerprint=order_plan_fingerprint,
+        max_plans=config.PLAN_CACHE_MAX_PLANS,
+    )
+
 # Used in order processing, no HIL
 processing_team = PlannedTeam(
     id="OrderProcessingTeam",
@@ -37,14 +58,20 @@ processing_team = PlannedTeam(
         # reviewer_agent, # NOTE not required with PlannedTeam, which has its own feedback strategy
     ],
     kernel=kernel,
-    planning_strategy=DefaultPlanningStrategy(
-        kernel=planning_kernel, include_tools_descriptions=True
+    # NOTE well-formed orders get the canonical plan, the planner model is only used for the others
+    planning_strategy=RuleBasedPlanningStrategy(
+        plan_template=ORDER_PLAN,
+        matcher=match_order_inquiry,
+        fallback=order_planner,
     ),
     feedback_strategy=KernelFunctionFeedbackStrategy(
         kernel=kernel,
+        history_reducer=TokenBudgetHistoryReducer(max_tokens=config.ORCHESTRATION_HISTORY_MAX_TOKENS),
         function=KernelFunctionFromPrompt(
             function_name="order_feedback",
+            # NOTE static criteria first and team output last, so the prompt prefix can be cached
             prompt="""
+<message role="system">
 You must review the output of the order team and provide feedback.
 The feedback MUST be a JSON object with the following structure:
 
@@ -58,13 +85,19 @@ The feedback MUST be a JSON object with the following structure:
 - If there were missing information or unresolved issues, the order processing is failed. Set "should_terminate" to true and provide a feedback message explaining the issue.
 - If the processing failed due to temporary failures, or any step can be retried, set "should_terminate" to false and provide a feedback message explaining the issue.
 - If the order was validated and no issues were found, set "should_terminate" to true and leave "feedback" empty.
-
-
+</message>
+<message role="user">
 # ORDER TEAM OUTPUT
-{{{{$history}}}}
+{{$history}}
+</message>
 """,
         ),
     ),
+    debug_trace=(
+        DebugTraceSink(sample_rate=config.DEBUG_TRACE_SAMPLE_RATE)
+        if config.DEBUG_TRACE_SAMPLE_RATE > 0
+        else None
+    ),
 )
 
 # Used in chat/skill with user
@@ -82,7 +115,51 @@ assistant_team = Team(
     ],
     kernel=kernel,
     selection_strategy=SpeakerElectionStrategy(
-        kernel=kernel, include_tools_descriptions=True
+        kernel=kernel,
+        include_tools_descriptions=True,
+        # The last 3 messages (besides tool calls), within the token budget
+        history_reducer=TokenBudgetHistoryReducer(
+            max_tokens=config.ORCHESTRATION_HISTORY_MAX_TOKENS,
+            target_count=3,
+            pin_first_user_message=False,
+        ),
+        # NOTE obvious turns are elected locally, the model is only called for ambiguous ones
+        user_agent=chat_user_agent,
+        allowed_transitions={chat_greeter_agent: [chat_user_agent]},
+        agent_keywords={
+            chat_pricing_agent.id: [r"\bpric", r"\bdiscount", r"\bcost", r"\bquote", r"\btotal\b"],
+            chat_validator_agent.id: [r"\bvalid", r"\bmodif", r"\bcancel", r"\bchange (my|the) order"],
+            chat_substitution_agent.id: [r"\bsubstitut", r"\breplace", r"\balternative"],
+            chat_fulfillment_agent.id: [
+                r"\bdeliver", r"\bshipment", r"\bshipping", r"\btrack", r"\bbackorder", r"\bschedule",
+            ],
+            chat_greeter_agent.id: [r"^\s*(hi|hello|hey|good (morning|afternoon|evening))\b[\s!.,]*$"],
+        },
     ),
     termination_strategy=UserInputRequiredTerminationStrategy(stop_agents=[chat_user_agent]),
 )
+
+# Used by the actors for the history messages before the loaded window
+history_summarizer = KernelFunctionSummaryStrategy(
+    kernel=kernel,
+    history_reducer=TokenBudgetHistoryReducer(max_tokens=config.ORCHESTRATION_HISTORY_MAX_TOKENS),
+    function=KernelFunctionFromPrompt(
+        function_name="history_summary",
+        # NOTE static instructions first, so the prompt prefix can be cached
+        prompt="""
+<message role="system">
+You summarize a conversation between a user and an order team, for the agents continuing it.
+The summary replaces the messages, so it MUST keep every fact the agents may need later:
+order and customer ids, SKUs, quantities, prices, substitutions, delivery dates, decisions made and open issues.
+Update the previous summary (if any) with the new messages. Answer with the summary only, in at most 300 words.
+</message>
+<message role="user">
+# PREVIOUS SUMMARY
+{{$summary}}
+
+# NEW MESSAGES
+{{$messages}}
+</message>
+""",
+    ),
+)
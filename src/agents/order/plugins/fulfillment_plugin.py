@@ -3,6 +3,7 @@ from typing import Annotated, Any, Dict, List
 from pydantic import BaseModel, Field
 from semantic_kernel.functions import kernel_function
 
+from utils.query import Query
 from utils.store import get_data_store
 
 
@@ -144,8 +145,9 @@ class FulfillmentPlugin:
         Returns:
             Dict[str, Any]: Dictionary containing facility information with inventory levels for the requested SKUs
         """
-        # TODO for real data, build a query to filter
-        facilities = self.data_store.query_data("SELECT * FROM c", "facility")
+        facilities = await self.data_store.query_data(
+            Query().where_any_in("skuAvailability", "sku", skus), "facility"
+        )
 
         return facilities
 
@@ -175,10 +177,9 @@ class FulfillmentPlugin:
                 - Standard delivery timeframes by region
                 - Current operational status
         """
-        query = "SELECT * FROM c"
+        query = Query()
         if facility_ids:
-            id_list = ", ".join([f"'{id}'" for id in facility_ids])
-            query = f"SELECT * FROM c WHERE c.id IN ({id_list})"
+            query.where_in("id", facility_ids)
 
         facilities = await self.data_store.query_data(query, "facility")
 
@@ -225,10 +226,12 @@ class FulfillmentPlugin:
                                  ordered by date (most recent first)
         """
         # Build a query that filters by customer_id and optionally by status
-        status_filter = "" if include_drafts else "AND c.status != 'DRAFT'"
-        query = f"SELECT * FROM c WHERE c.customerId = '{customer_id}' {status_filter} ORDER BY c.orderDate DESC LIMIT {limit}"
+        query = Query().where("customerId", "=", customer_id)
+        if not include_drafts:
+            query.where("status", "!=", "DRAFT")
+        query.order_by("orderDate", descending=True).limit(limit)
 
-        orders = self.data_store.query_data(query, "order")
+        orders = await self.data_store.query_data(query, "order")
         return orders
 
     @kernel_function(
@@ -299,19 +302,23 @@ class FulfillmentPlugin:
         """
         results = {"processed_orders": 0, "failed_orders": [], "optimized_delivery": {}}
 
-        # Load all orders
+        # Load all orders in a single round trip
         orders = []
-        for order_id in order_ids:
-            try:
-                order = await self.data_store.get_data(order_id, "order")
-                if order:
-                    orders.append({"id": order_id, "data": order})
-                else:
-                    results["failed_orders"].append(
-                        {"id": order_id, "reason": "Order not found"}
-                    )
-            except Exception as e:
-                results["failed_orders"].append({"id": order_id, "reason": str(e)})
+        try:
+            loaded_orders = await self.data_store.get_many(order_ids, "order")
+        except Exception as e:
+            loaded_orders = []
+            results["failed_orders"].extend(
+                {"id": order_id, "reason": str(e)} for order_id in order_ids
+            )
+
+        for order_id, order in zip(order_ids, loaded_orders):
+            if order:
+                orders.append({"id": order_id, "data": order})
+            else:
+                results["failed_orders"].append(
+                    {"id": order_id, "reason": "Order not found"}
+                )
 
         # Process valid orders
         if orders:
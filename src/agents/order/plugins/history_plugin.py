@@ -0,0 +1,30 @@
+import logging
+
+from semantic_kernel.functions import kernel_function
+from typing_extensions import Annotated
+
+from actors.history_state import active_history_state
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryPlugin:
+    """
+    Gives the agents the large tool results moved out of the conversation history once consumed,
+    which keep their reference (payload:<digest>) and beginning in the history.
+    """
+
+    @kernel_function(
+        name="get_tool_result",
+        description="Get the whole result of an earlier tool call, stored as payload:<digest> in the conversation.",
+    )
+    async def get_tool_result(
+        self, reference: Annotated[str, "The reference of the stored result, e.g. payload:<digest>"]
+    ) -> Annotated[str, "The whole tool result"]:
+        history_state = active_history_state.get()
+        payload = await history_state.get_payload(reference) if history_state is not None else None
+        if payload is None:
+            logger.warning(f"No tool result is stored as {reference}")
+            return f"No tool result is stored as {reference}."
+        logger.info(f"Fetched tool result {reference}")
+        return payload
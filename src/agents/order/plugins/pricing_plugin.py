@@ -1,12 +1,63 @@
 import logging
-from typing import Annotated
+from collections import OrderedDict
+from typing import Annotated, List
 
+from pydantic import BaseModel
 from semantic_kernel.functions import kernel_function
 from utils.store import get_data_store
 
 logger = logging.getLogger(__name__)
 
 
+# Maximum number of customers whose compiled price table is kept in memory
+MAX_PRICE_TABLES = 1000
+
+
+class OrderLine(BaseModel):
+    sku: str
+    quantity: int
+    unit_price: float
+
+
+class PriceTables:
+    """
+    Per-customer SKU -> price lookup tables, compiled from the customer pricesheets.
+    A table is reused until the pricesheet "updated" field changes, and the least
+    recently used tables are evicted beyond the size bound.
+    """
+
+    def __init__(self, max_customers: int):
+        self.max_customers = max_customers
+        self._tables: OrderedDict[str, tuple[str, dict[str, float]]] = OrderedDict()
+
+    def get(self, customer_id: str, customer: dict | None) -> dict[str, float]:
+        if not customer or "items" not in customer.get("pricesheet", {}):
+            self._tables.pop(customer_id, None)
+            return {}
+
+        pricesheet = customer["pricesheet"]
+        updated = pricesheet.get("updated")
+        cached = self._tables.get(customer_id)
+        if updated is not None and cached is not None and cached[0] == updated:
+            self._tables.move_to_end(customer_id)
+            return cached[1]
+
+        table = {price["sku"]: price["price"] for price in pricesheet["items"]}
+        logger.debug(f"Compiled price table for customer {customer_id} ({len(table)} SKUs)")
+
+        # NOTE sheets without an "updated" field cannot be validated, so they are not kept
+        if updated is not None:
+            self._tables[customer_id] = (updated, table)
+            self._tables.move_to_end(customer_id)
+            while len(self._tables) > self.max_customers:
+                self._tables.popitem(last=False)
+        return table
+
+
+# Shared by all pricing plugin instances
+price_tables = PriceTables(max_customers=MAX_PRICE_TABLES)
+
+
 class PricingAgentPlugin:
     """
     Plugin for pricing-related functionality.
@@ -65,15 +116,10 @@ class PricingAgentPlugin:
             A string containing information about the customer-specific pricing
         """
         pricesheet = await self.data_store.get_data(customer_id, "customer")
-        if pricesheet:
-            prices = pricesheet["pricesheet"]["items"]
-
-            for price in prices:
-                if price["sku"] == sku:
-                    logger.info(f"Customer price for SKU {sku}: {price['price']}")
-                    return f"Customer price for SKU {sku}: {price['price']}"
-            logger.info(f"No specific price for SKU {sku} for customer {customer_id}")
-            return f"No specific price for SKU {sku} for customer {customer_id}"
+        customer_prices = price_tables.get(customer_id, pricesheet)
+        if sku in customer_prices:
+            logger.info(f"Customer price for SKU {sku}: {customer_prices[sku]}")
+            return f"Customer price for SKU {sku}: {customer_prices[sku]}"
 
         logger.info(f"No specific price for SKU {sku} for customer {customer_id}")
         return f"No specific price for SKU {sku} for customer {customer_id}"
@@ -101,6 +147,79 @@ class PricingAgentPlugin:
         Returns:
             A dictionary with detailed price calculation information
         """
+        # Check for customer-specific pricing
+        pricesheet = await self.data_store.get_data(customer_id, "customer")
+        customer_prices = price_tables.get(customer_id, pricesheet)
+
+        # Check for quantity discount
+        discount_info = await self.data_store.get_data(sku, "discount")
+
+        result = self._price_line(
+            sku, quantity, unit_price, customer_prices.get(sku), discount_info
+        )
+        logger.info(f"Price calculation for SKU {sku}: {result}")
+        return result
+
+    @kernel_function(
+        name="calculate_order_prices",
+        description="Calculate the final prices of all the lines of an order at once, considering both quantity discounts and customer-specific pricing. Prefer this over calling calculate_final_price for each SKU.",
+    )
+    async def calculate_order_prices(
+        self,
+        lines: Annotated[
+            List[OrderLine],
+            "The order lines to price, each with sku, quantity and standard unit_price",
+        ],
+        customer_id: Annotated[str, "The customer ID"],
+    ) -> Annotated[dict, "Detailed price calculation for each line and the order subtotal"]:
+        """
+        Calculate the final prices for all the lines of an order in a single call.
+        The customer pricesheet is read once and the discounts of all SKUs are fetched in bulk.
+
+        Args:
+            lines: The order lines to price, each with SKU, quantity and standard unit price
+            customer_id: The customer ID
+
+        Returns:
+            A dictionary with the price calculation of each line, line totals and order subtotal
+        """
+        pricesheet = await self.data_store.get_data(customer_id, "customer")
+        customer_prices = price_tables.get(customer_id, pricesheet)
+
+        skus = list(dict.fromkeys(line.sku for line in lines))
+        discounts = dict(zip(skus, await self.data_store.get_many(skus, "discount")))
+
+        priced_lines = [
+            self._price_line(
+                line.sku,
+                line.quantity,
+                line.unit_price,
+                customer_prices.get(line.sku),
+                discounts[line.sku],
+            )
+            for line in lines
+        ]
+        line_totals = [line["line_total"] for line in priced_lines]
+
+        result = {
+            "customer_id": customer_id,
+            "lines": priced_lines,
+            "line_totals": line_totals,
+            "order_subtotal": round(sum(line_totals), 2),
+        }
+
+        logger.info(f"Price calculation for order of customer {customer_id}: {result}")
+        return result
+
+    def _price_line(
+        self,
+        sku: str,
+        quantity: int,
+        unit_price: float,
+        customer_price: float | None,
+        discount_info: dict | None,
+    ) -> dict:
+        """Price a single line from the customer price and discount of its SKU."""
         # Initialize result structure
         result = {
             "sku": sku,
@@ -115,24 +234,16 @@ class PricingAgentPlugin:
             "pricing_details": [],
         }
 
-        # Check for customer-specific pricing
-        pricesheet = await self.data_store.get_data(customer_id, "customer")
-        if (
-            pricesheet
-            and "pricesheet" in pricesheet
-            and "items" in pricesheet["pricesheet"]
-        ):
-            for price in pricesheet["pricesheet"]["items"]:
-                if price["sku"] == sku:
-                    result["has_customer_specific_price"] = True
-                    result["customer_unit_price"] = price["price"]
-                    result["final_unit_price"] = price["price"]
-                    result["pricing_details"].append(
-                        f"Customer-specific price applied: ${price['price']}"
-                    )
+        # Apply customer-specific pricing
+        if customer_price is not None:
+            result["has_customer_specific_price"] = True
+            result["customer_unit_price"] = customer_price
+            result["final_unit_price"] = customer_price
+            result["pricing_details"].append(
+                f"Customer-specific price applied: ${customer_price}"
+            )
 
-        # Check for quantity discount
-        discount_info = await self.data_store.get_data(sku, "discount")
+        # Apply quantity discount
         if (
             discount_info
             and "minimum" in discount_info
@@ -167,7 +278,6 @@ class PricingAgentPlugin:
             f"Final price calculation: {quantity} units × ${result['final_unit_price']} = ${result['line_total']}"
         )
 
-        logger.info(f"Price calculation for SKU {sku}: {result}")
         return result
 
     @kernel_function(
@@ -2,6 +2,8 @@ import logging
 from typing import Annotated
 
 from semantic_kernel.functions import kernel_function
+from utils.inventory import inventory_index
+from utils.query import Query
 from utils.store import get_data_store
 
 logger = logging.getLogger(__name__)
@@ -40,36 +42,13 @@ class SubstitutionAgentPlugin:
         Returns:
             A dictionary containing availability status and details for each SKU in the order
         """
-        results = {}
-
-        facilities = await self.data_store.query_data("SELECT * FROM c", "facility")
-
+        requested = []
         for item in sku_quantity_list:
             sku_items = item.split(":")
-            sku_id = sku_items[0]
-            quantity = int(sku_items[1])
-            total_available = 0
-            locations = []
-
-            for facility in facilities:
-                for sku_availability in facility.get("skuAvailability", []):
-                    if sku_id in sku_availability["sku"]:
-                        available = sku_availability["availableQuantity"]
-                        total_available += available
-                        locations.append(
-                            {
-                                "facility_id": facility["id"],
-                                "name": facility.get("name", "Unknown"),
-                                "available": available,
-                            }
-                        )
+            requested.append((sku_items[0], int(sku_items[1])))
 
-            results[sku_id] = {
-                "requested": quantity,
-                "available": total_available,
-                "is_available": total_available >= quantity,
-                "locations": locations,
-            }
+        # Look up the shared SKU to facility index, instead of scanning every facility
+        results = await inventory_index.check_availability(self.data_store, requested)
 
         logger.info(f"Inventory Check completed. Here are the results:\n{str(results)}")
         return f"Inventory Check completed. Here are the results:\n{str(results)}"
@@ -93,7 +72,9 @@ class SubstitutionAgentPlugin:
         Returns:
             A dictionary mapping each SKU to its substitute SKU, if available
         """
-        available_skus = await self.data_store.query_data("SELECT * FROM c", "sku")
+        available_skus = await self.data_store.query_data(
+            Query().where_in("id", skus_to_check), "sku"
+        )
         available_skus_dict = {sku["id"]: sku for sku in available_skus}
 
         substitutes = {}
@@ -5,6 +5,8 @@ from semantic_kernel.agents import ChatCompletionAgent
 from semantic_kernel.functions import kernel_function
 from typing_extensions import Annotated
 from utils.config import get_azure_openai_client
+from utils.inventory import inventory_index
+from utils.query import Query
 from utils.store import get_data_store
 
 logger = logging.getLogger(__name__)
@@ -37,7 +39,10 @@ class ValidationPlugin:
         """
         Validates the SKU of the order.
         """
-        avaiilable_skus = await self.data_store.query_data("SELECT * FROM c", "sku")
+        # Only fetch the requested SKUs, not the whole catalog
+        avaiilable_skus = await self.data_store.query_data(
+            Query().where_in("id", sku_list), "sku"
+        )
         skus_dict = {sku["id"]: sku for sku in avaiilable_skus}
 
         # Check if all SKUs are available
@@ -69,36 +74,13 @@ class ValidationPlugin:
         Returns:
             A dictionary containing availability status and details for each SKU in the order
         """
-        results = {}
-
-        facilities = await self.data_store.query_data("SELECT * FROM c", "facility")
-
+        requested = []
         for item in sku_quantity_list:
             sku_items = item.split(":")
-            sku_id = sku_items[0]
-            quantity = int(sku_items[1])
-            total_available = 0
-            locations = []
-
-            for facility in facilities:
-                for sku_availability in facility.get("skuAvailability", []):
-                    if sku_id in sku_availability["sku"]:
-                        available = sku_availability["availableQuantity"]
-                        total_available += available
-                        locations.append(
-                            {
-                                "facility_id": facility["id"],
-                                "name": facility.get("name", "Unknown"),
-                                "available": available,
-                            }
-                        )
+            requested.append((sku_items[0], int(sku_items[1])))
 
-            results[sku_id] = {
-                "requested": quantity,
-                "available": total_available,
-                "is_available": total_available >= quantity,
-                "locations": locations,
-            }
+        # Look up the shared SKU to facility index, instead of scanning every facility
+        results = await inventory_index.check_availability(self.data_store, requested)
 
         logger.info(f"Inventory Check completed. Here are the results:\n{str(results)}")
         return f"Inventory Check completed. Here are the results:\n{str(results)}"
\ No newline at end of file
@@ -2,6 +2,7 @@
 from semantic_kernel.agents import ChatCompletionAgent
 from utils.config import get_azure_openai_client, config
 from order.plugins.fulfillment_plugin import FulfillmentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 fulfillment_agent = ChatCompletionAgent(
     id="fulfillment_agent",
@@ -221,5 +222,5 @@ ALWAYS base your response on the available data. DO NOT invent data or fake info
 REMEMBER: Your output is an OFFICIAL FULFILLMENT RECORD - be comprehensive, precise, and thorough.
 """,
     service=get_azure_openai_client(config.PLANNING_MODEL),
-    plugins=[FulfillmentPlugin()],
+    plugins=[FulfillmentPlugin(), HistoryPlugin()],
 )
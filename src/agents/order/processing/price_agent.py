@@ -6,6 +6,7 @@ from utils.config import get_azure_openai_client
 logger = logging.getLogger(__name__)
 
 from order.plugins.pricing_plugin import PricingAgentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 pricing_agent = ChatCompletionAgent(
@@ -53,6 +54,7 @@ You MUST provide extremely comprehensive pricing documentation for every SKU in
 - Document the pricing rationale for each substitution clearly
 
 ### 5. FINAL PRICING CALCULATION
+- Use `calculate_order_prices` to price ALL lines of the order in a single call, rather than calling `calculate_final_price` once per SKU
 - Calculate the final price for each line item with all applicable discounts
 - Make sure to calculate ONLY the available quantity of each SKU, taking into account any substitutions. The original order quantities might NOT be valid after substitutions.
 - Calculate order subtotal, tax (if applicable), and grand total
@@ -175,5 +177,5 @@ REMEMBER: Your output is an OFFICIAL PRICING RECORD - be comprehensive, precise,
 IMPORTANT: For any substituted items flagged by the substitution_agent, you MUST perform a complete re-analysis of pricing for those items, considering both the original and substitute SKUs.
 """,
     service=get_azure_openai_client(),
-    plugins=[PricingAgentPlugin()],
+    plugins=[PricingAgentPlugin(), HistoryPlugin()],
 )
@@ -6,6 +6,7 @@ from utils.config import get_azure_openai_client
 logger = logging.getLogger(__name__)
 
 from order.plugins.substitution_plugin import SubstitutionAgentPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 substitution_agent = ChatCompletionAgent(
@@ -224,5 +225,5 @@ REMEMBER: Your output is an OFFICIAL AUDIT DOCUMENT and will be used by other ag
 CRITICAL REMINDER: ALWAYS use ALL available original SKU inventory FIRST, then substitute ONLY for the shortage amount.
 """,
     service=get_azure_openai_client(),
-    plugins=[SubstitutionAgentPlugin()],
+    plugins=[SubstitutionAgentPlugin(), HistoryPlugin()],
 )
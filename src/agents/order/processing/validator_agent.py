@@ -6,6 +6,7 @@ from utils.config import get_azure_openai_client
 logger = logging.getLogger(__name__)
 
 from order.plugins.validation_plugin import ValidationPlugin
+from order.plugins.history_plugin import HistoryPlugin
 
 
 validator_agent = ChatCompletionAgent(
@@ -189,5 +190,5 @@ ALWAYS base your response on the available data. DO NOT invent data or fake info
 REMEMBER: Your output is an OFFICIAL AUDIT DOCUMENT - be comprehensive, precise, and thorough.
 """,
     service=get_azure_openai_client(),
-    plugins=[ValidationPlugin()],
+    plugins=[ValidationPlugin(), HistoryPlugin()],
 )
@@ -0,0 +1,44 @@
+import logging
+import random
+
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.kernel_pydantic import KernelBaseModel
+
+# Transcripts go to their own logger, so they can be routed apart from the application logs
+trace_logger = logging.getLogger("sk_ext.trace")
+
+
+class DebugTraceSink(KernelBaseModel):
+    """
+    Opt-in transcript of the plan steps of a team, for debugging.
+    Each step is written once, with its instructions, input size and output, so tracing a
+    plan costs O(output) rather than rendering the whole history before every step.
+    Invocations are sampled, and nothing is written unless the trace logger is at DEBUG level.
+
+    Args:
+        sample_rate (float): The fraction of invocations to trace, between 0 (disabled) and 1.
+        max_content_length (int): The length at which message contents are cut.
+    """
+
+    sample_rate: float = 0.0
+    max_content_length: int = 2000
+
+    def sample(self) -> bool:
+        """Decide whether to trace an invocation."""
+        if self.sample_rate <= 0 or not trace_logger.isEnabledFor(logging.DEBUG):
+            return False
+        return random.random() < self.sample_rate
+
+    def step_started(self, team_id: str, index: int, agent_id: str, instructions: str, input_count: int) -> None:
+        trace_logger.debug(
+            f"{team_id} step {index} ({agent_id}) started with {input_count} messages: {instructions}"
+        )
+
+    def step_completed(self, team_id: str, index: int, messages: list[ChatMessageContent]) -> None:
+        for message in messages:
+            if message.content is None or message.content.strip() == "":
+                continue
+            content = message.content
+            if len(content) > self.max_content_length:
+                content = content[: self.max_content_length] + "..."
+            trace_logger.debug(f"{team_id} step {index} {message.role.value} {message.name or ''}: {content}")
@@ -6,8 +6,14 @@ from semantic_kernel.kernel import Kernel
 from semantic_kernel.functions.kernel_arguments import KernelArguments
 from semantic_kernel.functions.kernel_function import KernelFunction
 from semantic_kernel.kernel_pydantic import KernelBaseModel
+from semantic_kernel.contents.history_reducer.chat_history_reducer import (
+    ChatHistoryReducer,
+)
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
+from sk_ext.history_reducer import reduce_messages
+from sk_ext.usage import record_prompt_usage
+
 if TYPE_CHECKING:
     from semantic_kernel.contents.chat_message_content import ChatMessageContent
 
@@ -42,11 +48,15 @@ class KernelFunctionFeedbackStrategy(FeedbackStrategy):
     """A strategy for determining when a Planned Team should terminate, and provide feedback to reiterate the plan if needed."""
 
     function: KernelFunction
+    history_reducer: ChatHistoryReducer | None = None
 
     async def provide_feedback(
         self, history: list["ChatMessageContent"]
     ) -> tuple[bool, str]:
         """ """
+        # Reduce the history if needed
+        history = await reduce_messages(self.history_reducer, history)
+
         # Flatten the history
         messages = [
             {
@@ -60,7 +70,8 @@ class KernelFunctionFeedbackStrategy(FeedbackStrategy):
 
         # Invoke the function
         arguments = KernelArguments()
-        arguments["history"] = messages
+        # As text, so it is escaped like the other variables in the message tags
+        arguments["history"] = str(messages)
 
         execution_settings = {}
         # https://devblogs.microsoft.com/semantic-kernel/using-json-schema-for-structured-output-in-python-for-openai-models/
@@ -72,6 +83,7 @@ class KernelFunctionFeedbackStrategy(FeedbackStrategy):
             execution_settings=execution_settings,
         )
         logger.info(f"FeedbackStrategy: {result}")
+        record_prompt_usage(self.function.name, result)
         raw_response = (
             result.value[0].content.strip().replace("```json", "").replace("```", "")
         )
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import logging
+import sys
+from collections import OrderedDict
+
+if sys.version_info >= (3, 12):
+    from typing import override  # pragma: no cover
+else:
+    from typing_extensions import override  # pragma: no cover
+
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import (
+    ChatHistoryReducer,
+)
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Encoding of the GPT-4o and o-series models
+TOKEN_ENCODING = "o200k_base"
+# Tokens added by the chat format to each message (role, separators)
+MESSAGE_TOKEN_OVERHEAD = 4
+# Number of distinct texts whose token count is kept
+TOKEN_COUNT_CACHE_SIZE = 4096
+TRUNCATION_MARKER = " [...]"
+
+_encoding = None
+# Token counts by text digest, so the cache does not hold the (possibly large) texts
+_token_counts: OrderedDict[bytes, int] = OrderedDict()
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding(TOKEN_ENCODING)
+        except Exception as ex:
+            # The encoding is downloaded on first use, which may not be possible
+            logger.warning(f"Could not load the {TOKEN_ENCODING} encoding, estimating token counts: {ex}")
+            _encoding = False
+    return _encoding or None
+
+
+async def load_encoding() -> None:
+    """Load the token encoding in a thread, as it is downloaded on first use."""
+    if _encoding is None:
+        await asyncio.to_thread(_get_encoding)
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens of a text with tiktoken, or estimate them (about 4 characters per token)
+    when it is not available. Counts are cached, so each message is only encoded once.
+    """
+    if not text:
+        return 0
+
+    key = hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+    count = _token_counts.get(key)
+    if count is not None:
+        _token_counts.move_to_end(key)
+        return count
+
+    encoding = _get_encoding()
+    count = len(encoding.encode(text, disallowed_special=())) if encoding else len(text) // 4 + 1
+
+    _token_counts[key] = count
+    if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+        _token_counts.popitem(last=False)
+    return count
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Truncate a text to about max_tokens tokens, marking the truncation."""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    encoding = _get_encoding()
+    if encoding:
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens]) + TRUNCATION_MARKER
+    return text[: max_tokens * 4] + TRUNCATION_MARKER
+
+
+def message_text(message: ChatMessageContent) -> str:
+    """The text of a message as sent to a model, including function calls and results."""
+    parts = [message.content or ""]
+    for item in message.items:
+        if isinstance(item, FunctionCallContent):
+            parts.append(f"{item.name}({item.arguments})")
+        elif isinstance(item, FunctionResultContent):
+            parts.append(str(item.result))
+    return "\n".join(part for part in parts if part)
+
+
+def count_message_tokens(message: ChatMessageContent) -> int:
+    return count_tokens(message_text(message)) + MESSAGE_TOKEN_OVERHEAD
+
+
+def is_tool_message(message: ChatMessageContent) -> bool:
+    return message.role == AuthorRole.TOOL or any(
+        isinstance(item, (FunctionCallContent, FunctionResultContent)) for item in message.items
+    )
+
+
+async def reduce_messages(
+    history_reducer: ChatHistoryReducer | None, messages: list[ChatMessageContent]
+) -> list[ChatMessageContent]:
+    """Reduce the messages with the given reducer, if any."""
+    if history_reducer is None:
+        return messages
+
+    history_reducer.messages = messages
+    reduced_history = await history_reducer.reduce()
+    return reduced_history.messages if reduced_history is not None else messages
+
+
+class TokenBudgetHistoryReducer(ChatHistoryReducer):
+    """
+    Keeps the history within a token budget, so the prompts of long running conversations stay bounded.
+
+    When the history does not fit, tool calls and results are dropped first, then the oldest messages.
+    A message that only partly fits the remaining budget is truncated to an excerpt instead of being dropped.
+    The first user message (usually the inquiry) is kept, truncated to half the budget at most, unless
+    pin_first_user_message is False. The most recent message is always kept, truncated to the budget if needed.
+
+    Args:
+        max_tokens (int): The token budget of the history.
+        target_count (int): The maximum number of messages to keep.
+        min_excerpt_tokens (int): The smallest excerpt worth keeping for a truncated message.
+        pin_first_user_message (bool): Whether to keep the first user message. Defaults to True.
+    """
+
+    max_tokens: int = 8000
+    target_count: int = 100
+    min_excerpt_tokens: int = 50
+    pin_first_user_message: bool = True
+
+    @override
+    async def reduce(self) -> ChatHistoryReducer | None:
+        await load_encoding()
+        messages = self.messages
+        total = sum(count_message_tokens(message) for message in messages)
+        if total <= self.max_tokens and len(messages) <= self.target_count:
+            return None
+
+        # Tool calls and results are the bulkiest and least useful part of the history
+        messages = [message for message in messages if not is_tool_message(message)] or messages[-1:]
+
+        # The first user message is pinned, as it usually holds the inquiry
+        budget = self.max_tokens
+        last_index = len(messages) - 1
+        first_index = None
+        if self.pin_first_user_message:
+            first_index = next(
+                (index for index, message in enumerate(messages) if message.role == AuthorRole.USER),
+                None,
+            )
+        kept: dict[int, ChatMessageContent] = {}
+        if first_index is not None and first_index != last_index:
+            kept[first_index] = self._fit(messages[first_index], self.max_tokens // 2)
+            budget -= count_message_tokens(kept[first_index])
+
+        # Keep the most recent messages that fit, newest first
+        for index in range(last_index, -1, -1):
+            if index in kept:
+                continue
+            if len(kept) >= self.target_count:
+                break
+
+            message = messages[index]
+            tokens = count_message_tokens(message)
+            if tokens <= budget:
+                kept[index] = message
+                budget -= tokens
+                continue
+
+            # A truncated excerpt is better than nothing, and the newest message is always kept
+            if index == last_index or budget >= self.min_excerpt_tokens + MESSAGE_TOKEN_OVERHEAD:
+                kept[index] = self._fit(message, max(budget, self.min_excerpt_tokens + MESSAGE_TOKEN_OVERHEAD))
+            break
+
+        logger.debug(
+            f"TokenBudgetHistoryReducer: kept {len(kept)}/{len(self.messages)} messages "
+            f"({total} tokens before, budget {self.max_tokens})"
+        )
+        self.messages = [kept[index] for index in sorted(kept)]
+        return self
+
+    def _fit(self, message: ChatMessageContent, max_tokens: int) -> ChatMessageContent:
+        """Return the message, or a truncated copy of it when it exceeds max_tokens."""
+        if count_message_tokens(message) <= max_tokens:
+            return message
+        return ChatMessageContent(
+            role=message.role,
+            name=message.name,
+            content=truncate_tokens(message_text(message), max_tokens - MESSAGE_TOKEN_OVERHEAD),
+        )
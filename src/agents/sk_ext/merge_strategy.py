@@ -5,8 +5,13 @@ from semantic_kernel.functions.kernel_arguments import KernelArguments
 from semantic_kernel.functions.kernel_function import KernelFunction
 from semantic_kernel.kernel_pydantic import KernelBaseModel
 from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import (
+    ChatHistoryReducer,
+)
 from semantic_kernel.contents.utils.author_role import AuthorRole
 
+from sk_ext.history_reducer import reduce_messages
+
 logger: logging.Logger = logging.getLogger(__name__)
 
 
@@ -41,13 +46,16 @@ class KernelFunctionMergeHistoryStrategy(MergeHistoryStrategy):
     """A strategy that merges the last message from the original history with the new history."""
 
     kernel_function: KernelFunction
+    history_reducer: ChatHistoryReducer | None = None
 
     async def merge(
         self,
         original_history: list["ChatMessageContent"],
         new_history: list["ChatMessageContent"],
     ) -> list["ChatMessageContent"]:
-        messages = new_history[len(original_history) :]
+        messages = await reduce_messages(
+            self.history_reducer, new_history[len(original_history) :]
+        )
         arguments = KernelArguments()
         arguments["messages"] = "\n".join(
             [
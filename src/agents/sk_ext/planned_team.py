@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import sys
 from collections.abc import AsyncIterable
@@ -24,16 +25,13 @@ from semantic_kernel.utils.telemetry.agent_diagnostics.decorators import (
     trace_agent_get_response,
     trace_agent_invocation,
 )
+from sk_ext.debug_trace import DebugTraceSink
 from sk_ext.feedback_strategy import FeedbackStrategy
 from sk_ext.merge_strategy import MergeHistoryStrategy
-from sk_ext.planning_strategy import PlanningStrategy
+from sk_ext.planning_strategy import PlanningStrategy, TeamPlan, TeamPlanStep
 
 logger = logging.getLogger(__name__)
 
-from rich.console import Console
-
-console = Console()
-
 
 class PlannedTeam(Agent):
     """A team of agents that executes a plan in a coordinated manner.
@@ -48,6 +46,7 @@ class PlannedTeam(Agent):
         is_complete (bool, optional): Whether the team has completed its plan. Defaults to False.
         fork_history (bool, optional): Whether to fork the history for each iteration. Defaults to False.
         merge_strategy (MergeHistoryStrategy): The strategy used to merge the history after each iteration.
+        debug_trace (DebugTraceSink, optional): The sink of the step transcripts, for debugging. Defaults to None.
     """
 
     id: str
@@ -59,6 +58,7 @@ class PlannedTeam(Agent):
     is_complete: bool = False
     fork_history: bool = False
     merge_strategy: MergeHistoryStrategy = None
+    debug_trace: DebugTraceSink | None = None
 
     @trace_agent_get_response
     @override
@@ -117,11 +117,17 @@ class PlannedTeam(Agent):
         history: ChatHistory,
         arguments: KernelArguments | None = None,
         kernel: "Kernel | None" = None,
+        stream: bool = False,
         **kwargs: Any,
     ) -> AsyncIterable[ChatMessageContent]:
+        """
+        Execute the plan, yielding the visible messages of the agents or, when streaming,
+        the chunks of their messages as they are produced.
+        """
         # In case the agent is invoked multiple times
         self.is_complete = False
         feedback: str = ""
+        trace = self.debug_trace is not None and self.debug_trace.sample()
 
         local_history = (
             history
@@ -132,60 +138,78 @@ class PlannedTeam(Agent):
             )
         )
 
-        # Channel required to communicate with agents
-        channel = await self.create_channel()
-        await channel.receive(local_history.messages)
-        must_replan = False
-
         while not self.is_complete:
             # Create a plan based on the current history and feedback (if any)
             plan = await self.planning_strategy.create_plan(
                 self.agents, local_history.messages, feedback
             )
+            must_replan = False
 
-            for step in plan.plan:
-                # Pick next agent to execute the step
-                selected_agent = next(
-                    agent for agent in self.agents if agent.id == step.agent_id
-                )
-                # And add the step instructions to the history
-                local_history.add_message(
-                    ChatMessageContent(
-                        role=AuthorRole.ASSISTANT,
-                        name=self.id,
-                        content=step.instructions,
-                    )
-                )
-
-                # channel.get_history() returns AsyncIterable[ChatMessageContent]
-
-                console.print("\n\n\n", 100*"~")
-                async for m in channel.get_history():
-                    if (m.content is not None) and (m.content.strip() != ""):
-                        console.print(100*">")
-                        console.print(m.content)
-                        console.print(100*"-")
-                console.print(100*"~", "\n\n\n")
-
-                # Then invoke the agent
-                async for is_visible, message in channel.invoke(selected_agent, messages=local_history):
-                    local_history.add_message(message)
-
-                    if is_visible and not self.fork_history:
-                        # If we are not forking history, we can yield the message
-                        # This prevents forked message to appear in the main history
-                        yield message
-
-                        if "~~~REPLAN" in message.content:
-                            # If the agent asks to replan, we need to break the loop and replan
-                            logger.warning(
-                                f"Agent {selected_agent.name} asked to replan"
-                            )
-                            must_replan = True
-                            break
-
-                if must_replan:
-                    break
+            # Steps start as soon as their dependencies complete, so independent steps run concurrently
+            stop = asyncio.Event()
+            tasks, queues = self._schedule_plan(
+                plan, list(local_history.messages), stop, stream, trace
+            )
+            try:
+                # Merge the steps output back in plan order, so the history is deterministic
+                # NOTE when streaming, the chunks of concurrent steps are buffered until their turn
+                for index, step in enumerate(plan.plan):
+                    # Add the step instructions to the history
+                    local_history.add_message(self._step_message(step))
+
+                    while (item := await queues[index].get()) is not None:
+                        is_visible, message = item
+                        if isinstance(message, StreamingChatMessageContent):
+                            if not self.fork_history:
+                                yield message
+                            continue
+
+                        local_history.add_message(message)
+
+                        # When streaming, the complete messages were already yielded as chunks
+                        if (is_visible or stream) and not self.fork_history:
+                            # If we are not forking history, we can yield the message
+                            # This prevents forked message to appear in the main history
+                            if not stream:
+                                yield message
+
+                            if "~~~REPLAN" in message.content:
+                                # If the agent asks to replan, we need to break the loop and replan
+                                logger.warning(f"Agent {step.agent_id} asked to replan")
+                                must_replan = True
+                                break
+
+                    if must_replan:
+                        # The steps already running finish, as their tools may have had side effects,
+                        # and their output is kept for the new plan; the steps not started are skipped
+                        stop.set()
+                        results = await asyncio.gather(*tasks, return_exceptions=True)
+                        for other_index, result in enumerate(results):
+                            if isinstance(result, Exception):
+                                logger.warning(f"Step {other_index} failed before replanning: {result}")
+                        for other_index in range(index, len(plan.plan)):
+                            items = []
+                            while (item := queues[other_index].get_nowait()) is not None:
+                                items.append(item)
+                            if other_index > index and items:
+                                local_history.add_message(self._step_message(plan.plan[other_index]))
+                            for is_visible, message in items:
+                                if isinstance(message, StreamingChatMessageContent):
+                                    if not self.fork_history:
+                                        yield message
+                                    continue
+                                local_history.add_message(message)
+                                if is_visible and not stream and not self.fork_history:
+                                    yield message
+                        break
+
+                    # Surface any error raised by the step
+                    await tasks[index]
+            finally:
+                # Steps still running are no longer needed, e.g. when replanning
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
 
             if must_replan:
                 self.is_complete = False
@@ -195,7 +219,7 @@ class PlannedTeam(Agent):
                     local_history.messages
                 )
                 self.is_complete = ok
-            
+
         # Merge the history if needed
         if self.fork_history:
             logger.debug("Merging history after iteration")
@@ -205,60 +229,138 @@ class PlannedTeam(Agent):
 
             # Yield the merged history delta
             for d in delta:
-                yield d
-
-    @trace_agent_invocation
-    async def invoke_stream(
-        self,
-        history: ChatHistory,
-        arguments: KernelArguments | None = None,
-        kernel: "Kernel | None" = None,
-        **kwargs: Any,
-    ) -> AsyncIterable[StreamingChatMessageContent]:
-        # In case the agent is invoked multiple times
-        self.is_complete = False
-        feedback: str = ""
+                yield self._to_streaming(d) if stream else d
+
+    def _to_streaming(self, message: ChatMessageContent) -> StreamingChatMessageContent:
+        return StreamingChatMessageContent(
+            role=message.role,
+            name=message.name,
+            content=message.content,
+            choice_index=0,
+        )
 
-        local_history = (
-            history
-            if not self.fork_history
-            # When forking history, we need to create a new copy of ChatHistory
-            else ChatHistory(
-                system_message=history.system_message, messages=history.messages.copy()
-            )
+    def _step_message(self, step: TeamPlanStep) -> ChatMessageContent:
+        return ChatMessageContent(
+            role=AuthorRole.ASSISTANT,
+            name=self.id,
+            content=step.instructions,
         )
 
-        # Channel required to communicate with agents
-        channel = await self.create_channel()
-        await channel.receive(local_history.messages)
+    def _resolve_dependencies(self, plan: TeamPlan) -> list[list[int]]:
+        """
+        Resolve the steps each plan step depends on.
+        Steps without explicit dependencies depend on the previous one, as in a sequential plan.
+        """
+        dependencies = []
+        for index, step in enumerate(plan.plan):
+            if step.depends_on is None:
+                step_dependencies = [index - 1] if index > 0 else []
+            else:
+                # Only earlier steps are valid dependencies, which keeps the graph acyclic
+                step_dependencies = sorted({d for d in step.depends_on if 0 <= d < index})
+                if len(step_dependencies) != len(set(step.depends_on)):
+                    logger.warning(
+                        f"Ignoring invalid dependencies {step.depends_on} of step {index}"
+                    )
+            dependencies.append(step_dependencies)
+        return dependencies
 
-        while not self.is_complete:
-            plan = await self.planning_strategy.create_plan(
-                self.agents, local_history.messages, feedback
-            )
+    def _schedule_plan(
+        self,
+        plan: TeamPlan,
+        messages: list[ChatMessageContent],
+        stop: asyncio.Event,
+        stream: bool = False,
+        trace: bool = False,
+    ) -> tuple[list[asyncio.Task], list[asyncio.Queue]]:
+        """
+        Start a task per plan step, each waiting for its dependencies before invoking its agent.
 
-            for step in plan.plan:
+        Each step gets its own channel, with the history before the plan followed by the
+        instructions and output of the steps it (transitively) depends on, in plan order.
+        The step output is published to its queue as it is produced, followed by None.
+        Steps whose dependencies complete after stop is set are skipped.
+        When streaming, the chunks are published first, then the complete messages as not visible.
+        """
+        steps = plan.plan
+        dependencies = self._resolve_dependencies(plan)
+        ancestors: list[set[int]] = []
+        for step_dependencies in dependencies:
+            step_ancestors = set(step_dependencies)
+            for dependency in step_dependencies:
+                step_ancestors |= ancestors[dependency]
+            ancestors.append(step_ancestors)
+
+        outputs: list[list[ChatMessageContent]] = [[] for _ in steps]
+        queues: list[asyncio.Queue] = [asyncio.Queue() for _ in steps]
+        tasks: list[asyncio.Task] = []
+
+        async def run_step(index: int) -> None:
+            step = steps[index]
+            try:
+                await asyncio.gather(*[tasks[d] for d in dependencies[index]])
+                if stop.is_set():
+                    return
+
+                # Pick the agent to execute the step
                 selected_agent = next(
                     agent for agent in self.agents if agent.id == step.agent_id
                 )
-                history.add_message(
-                    ChatMessageContent(
-                        role=AuthorRole.ASSISTANT,
-                        name=self.id,
-                        content=step.instructions,
+
+                step_messages = list(messages)
+                for ancestor in sorted(ancestors[index]):
+                    step_messages.append(self._step_message(steps[ancestor]))
+                    step_messages.extend(outputs[ancestor])
+                step_messages.append(self._step_message(step))
+
+                # Channel required to communicate with agents
+                channel = await self.create_channel()
+                await channel.receive(step_messages)
+                if trace:
+                    self.debug_trace.step_started(
+                        self.id, index, step.agent_id, step.instructions, len(step_messages)
                     )
-                )
 
-                messages: list[ChatMessageContent] = []
+                # Then invoke the agent
+                if stream:
+                    step_output: list[ChatMessageContent] = []
+                    async for chunk in channel.invoke_stream(selected_agent, step_output):
+                        queues[index].put_nowait((True, chunk))
+                    for message in step_output:
+                        outputs[index].append(message)
+                        queues[index].put_nowait((False, message))
+                else:
+                    async for is_visible, message in channel.invoke(selected_agent):
+                        outputs[index].append(message)
+                        queues[index].put_nowait((is_visible, message))
+                if trace:
+                    self.debug_trace.step_completed(self.id, index, outputs[index])
+            finally:
+                queues[index].put_nowait(None)
+
+        for index in range(len(steps)):
+            tasks.append(asyncio.create_task(run_step(index)))
+
+        return tasks, queues
 
-                # TODO: when forking history, do we need to still yield intermediate messages?
-                async for message in channel.invoke_stream(selected_agent, messages):
-                    yield message
+    @trace_agent_invocation
+    async def invoke_stream(
+        self,
+        history: ChatHistory,
+        arguments: KernelArguments | None = None,
+        kernel: "Kernel | None" = None,
+        **kwargs: Any,
+    ) -> AsyncIterable[StreamingChatMessageContent]:
+        """Invoke the team in streaming mode, with the same planning, replanning and feedback as invoke.
 
-                for message in messages:
-                    local_history.messages.append(message)
+        Args:
+            history: The chat history.
+            arguments: The kernel arguments.
+            kernel: The kernel instance.
+            kwargs: The keyword arguments.
 
-            ok, feedback = await self.feedback_strategy.provide_feedback(
-                local_history.messages
-            )
-            self.is_complete = ok
+        Returns:
+            An async iterable of StreamingChatMessageContent.
+        """
+        async for response in self._inner_invoke(history, arguments, kernel, stream=True, **kwargs):
+            yield response
@@ -1,13 +1,19 @@
-from opentelemetry import trace
+from opentelemetry import metrics, trace
+import json
 import os
+import re
 from abc import ABC
-from typing import TYPE_CHECKING, Annotated
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Annotated, Any, Callable
+
+from pydantic import PrivateAttr
 
 from semantic_kernel import Kernel
 from semantic_kernel.agents import Agent
 from semantic_kernel.contents.history_reducer.chat_history_reducer import (
     ChatHistoryReducer,
 )
+from semantic_kernel.contents.utils.author_role import AuthorRole
 from semantic_kernel.exceptions.agent_exceptions import AgentExecutionException
 from semantic_kernel.functions.kernel_arguments import KernelArguments
 from semantic_kernel.functions.kernel_function_from_prompt import (
@@ -15,6 +21,9 @@ from semantic_kernel.functions.kernel_function_from_prompt import (
 )
 from semantic_kernel.kernel_pydantic import KernelBaseModel
 
+from sk_ext.roster import roster_signature
+from sk_ext.usage import record_prompt_usage
+
 if TYPE_CHECKING:
     from semantic_kernel.contents.chat_message_content import ChatMessageContent
 
@@ -25,45 +34,18 @@ PLANNING_MODEL = os.environ.get("AZURE_OPENAI_PLANNING_DEPLOYMENT_NAME", "o4-min
 
 logger = logging.getLogger(__name__)
 
+meter = metrics.get_meter(__name__)
+plan_cache_hits = meter.create_counter(
+    "agents.plan_cache.hits", description="Plans served from the plan cache"
+)
+plan_cache_misses = meter.create_counter(
+    "agents.plan_cache.misses", description="Plans that required the planner"
+)
 
-class TeamPlanStep(KernelBaseModel):
-    agent_id: Annotated[str, "The agent_id of the agent to execute"]
-    instructions: Annotated[str, "The instructions for the agent"]
-
-
-class TeamPlan(KernelBaseModel):
-    plan: Annotated[list[TeamPlanStep], "The plan to be executed by the team"]
-
-
-class PlanningStrategy(KernelBaseModel, ABC):
-    """Base strategy class for creating a plan to solve the user inquiry by using the available agents."""
-
-    history_reducer: ChatHistoryReducer | None = None
-    include_tools_descriptions: bool = False
-
-    async def create_plan(
-        self,
-        agents: list[Agent],
-        history: list["ChatMessageContent"],
-        feedback: str = "",
-    ) -> TeamPlan:
-        """ """
-        raise AgentExecutionException("create_plan not implemented")
-
-
-class DefaultPlanningStrategy(PlanningStrategy):
-    """
-    Default planning strategy that uses a kernel function to create a plan to solve the user inquiry by using the available agents.
-    """
-    kernel: Kernel
-
-    async def create_plan(
-        self,
-        agents: list[Agent],
-        history: list["ChatMessageContent"],
-        feedback: str = "",
-    ) -> TeamPlan:
-        prompt = """
+# The static rules and the roster come first, in the system message, so the prompt shares a
+# stable prefix across calls, which the provider can cache. The dynamic parts come last.
+planning_prompt = """
+<message role="system">
 You are an expert Order Processing Team Orchestrator responsible for creating a comprehensive plan to process purchase orders. Your task is to analyze the order inquiry and create a detailed execution plan using specialized agents.
 
 # PLANNING GUIDELINES
@@ -72,6 +54,7 @@ You are an expert Order Processing Team Orchestrator responsible for creating a
 3. SEQUENCE agents in the optimal order to handle dependencies.
 4. PROVIDE detailed instructions for each agent, tailored to the specific order scenario.
 5. ADDRESS any feedback from previous execution attempts.
+6. DECLARE the dependencies of each step in "depends_on", as the 0-based indexes of the earlier steps whose output it needs. Steps that do not need each other's output (e.g. pricing the original SKUs and looking up substitutes) run in parallel. Use null to simply depend on the previous step.
 
 # CORE WORKFLOW RULES
 - The validator_agent MUST ALWAYS be used first to verify order validity.
@@ -114,32 +97,80 @@ When feedback is provided, it indicates previous execution failed. Your plan mus
 
 The plan must be returned as JSON, with the following structure:
 
-{{
+{
     "plan": [
-        {{
+        {
             "agent_id": "agent_id",
-            "instructions": "instructions"
-        }},
+            "instructions": "instructions",
+            "depends_on": [0]
+        },
         ...
     ]
-}}
+}
 
 You MUST return the plan in the format specified above. DO NOT return anything else.
 
 # AVAILABLE AGENTS
-{agents}
+{{$agents}}
 
+BE SURE TO READ THE INSTRUCTIONS ABOVE AGAIN BEFORE PROCEEDING.
+</message>
+<message role="user">
 # INQUIRY
-{inquiry}
+{{$inquiry}}
 
 # FEEDBACK
-{feedback}
-
-BE SURE TO READ THE INSTRUCTIONS ABOVE AGAIN BEFORE PROCEEDING.
+{{$feedback}}
+</message>
 """
 
-        print(">>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>", self.kernel)
 
+class TeamPlanStep(KernelBaseModel):
+    agent_id: Annotated[str, "The agent_id of the agent to execute"]
+    instructions: Annotated[str, "The instructions for the agent"]
+    depends_on: Annotated[
+        list[int] | None,
+        "The 0-based indexes of the earlier steps this step needs the output of. "
+        "Empty when it needs none, null to depend on the previous step",
+    ] = None
+
+
+class TeamPlan(KernelBaseModel):
+    plan: Annotated[list[TeamPlanStep], "The plan to be executed by the team"]
+
+
+class PlanningStrategy(KernelBaseModel, ABC):
+    """Base strategy class for creating a plan to solve the user inquiry by using the available agents."""
+
+    history_reducer: ChatHistoryReducer | None = None
+    include_tools_descriptions: bool = False
+
+    async def create_plan(
+        self,
+        agents: list[Agent],
+        history: list["ChatMessageContent"],
+        feedback: str = "",
+    ) -> TeamPlan:
+        """ """
+        raise AgentExecutionException("create_plan not implemented")
+
+
+class DefaultPlanningStrategy(PlanningStrategy):
+    """
+    Default planning strategy that uses a kernel function to create a plan to solve the user inquiry by using the available agents.
+    The roster of the agents and the prompt function are built once, and only rebuilt when the agents or their plugins change.
+    """
+    kernel: Kernel
+
+    _function: KernelFunctionFromPrompt | None = PrivateAttr(default=None)
+    _roster: tuple[tuple, str] | None = PrivateAttr(default=None)
+
+    async def create_plan(
+        self,
+        agents: list[Agent],
+        history: list["ChatMessageContent"],
+        feedback: str = "",
+    ) -> TeamPlan:
         if self.history_reducer is not None:
             self.history_reducer.messages = history
             reduced_history = await self.history_reducer.reduce()
@@ -156,29 +187,31 @@ BE SURE TO READ THE INSTRUCTIONS ABOVE AGAIN BEFORE PROCEEDING.
             for message in history
         ]
 
-        agents_info = self._generate_agents_info(agents)
+        agents_info = self._get_agents_info(agents)
 
         # Invoke the function
         arguments = KernelArguments()
+        arguments["agents"] = agents_info
+        arguments["inquiry"] = messages[-1]["content"]
+        arguments["feedback"] = feedback
 
         execution_settings = self.kernel.get_prompt_execution_settings_from_service_id(service_id=PLANNING_MODEL)
         execution_settings.response_format = TeamPlan
         # https://devblogs.microsoft.com/semantic-kernel/using-json-schema-for-structured-output-in-python-for-openai-models/
         # execution_settings["response_format"] = TeamPlan
 
-        input_prompt = prompt.format(
-            agents=agents_info, inquiry=messages[-1]["content"], feedback=feedback
-        )
-        logger.info(f"CreatePlan prompt: {input_prompt}")
-        kfunc = KernelFunctionFromPrompt(
-            function_name="CreatePlan", prompt=input_prompt
-        )
-        result = await kfunc.invoke(
+        logger.info(f"CreatePlan inquiry: {arguments['inquiry']}")
+        if self._function is None:
+            self._function = KernelFunctionFromPrompt(
+                function_name="CreatePlan", prompt=planning_prompt
+            )
+        result = await self._function.invoke(
             kernel=self.kernel,
             arguments=arguments,
             execution_settings=execution_settings
         )
         logger.info(f"CreatePlan: {result}")
+        record_prompt_usage("CreatePlan", result)
         content = (
             result.value[0].content.strip().replace("```json", "").replace("```", "")
         )
@@ -190,6 +223,12 @@ BE SURE TO READ THE INSTRUCTIONS ABOVE AGAIN BEFORE PROCEEDING.
 
         return parsed_result
 
+    def _get_agents_info(self, agents: list["Agent"]) -> str:
+        signature = roster_signature(agents, self.include_tools_descriptions)
+        if self._roster is None or self._roster[0] != signature:
+            self._roster = (signature, self._generate_agents_info(agents))
+        return self._roster[1]
+
     def _generate_agents_info(self, agents: list["Agent"]) -> str:
         agents_info = []
         for agent in agents:
@@ -206,3 +245,222 @@ BE SURE TO READ THE INSTRUCTIONS ABOVE AGAIN BEFORE PROCEEDING.
             agents_info.append(agent_info)
 
         return "\n".join(agents_info)
+
+
+class RuleBasedPlanningStrategy(PlanningStrategy):
+    """
+    Planning strategy that emits a fixed plan for the inquiries it recognizes, without calling a model.
+    It falls back to another strategy (usually LLM based) when feedback is provided, the inquiry is not
+    recognized, or the plan requires agents that are not available.
+
+    Args:
+        plan_template (TeamPlan): The plan to emit, whose instructions are formatted with the matcher arguments.
+        matcher (Callable[[str], dict | None]): Returns the template arguments for a recognized inquiry, None otherwise.
+        fallback (PlanningStrategy): The strategy used when the inquiry is not recognized.
+    """
+
+    plan_template: TeamPlan
+    matcher: Callable[[str], dict[str, Any] | None]
+    fallback: PlanningStrategy
+
+    async def create_plan(
+        self,
+        agents: list[Agent],
+        history: list["ChatMessageContent"],
+        feedback: str = "",
+    ) -> TeamPlan:
+        span = trace.get_current_span()
+
+        arguments = None
+        # Feedback means a previous plan failed, which needs actual reasoning
+        if not feedback and history:
+            arguments = self.matcher(history[-1].content or "")
+
+        agent_ids = {agent.id for agent in agents}
+        if arguments is None or any(
+            step.agent_id not in agent_ids for step in self.plan_template.plan
+        ):
+            logger.info("RuleBasedPlanningStrategy: falling back to the planner")
+            span.set_attribute("gen_ai.plannedteam.planner", "fallback")
+            return await self.fallback.create_plan(agents, history, feedback)
+
+        plan = TeamPlan(
+            plan=[
+                TeamPlanStep(
+                    agent_id=step.agent_id,
+                    instructions=step.instructions.format(**arguments),
+                    depends_on=step.depends_on,
+                )
+                for step in self.plan_template.plan
+            ]
+        )
+        logger.info(f"RuleBasedPlanningStrategy: {plan}")
+
+        # Add custom metadata to the current OpenTelemetry span
+        span.set_attribute("gen_ai.plannedteam.planner", "rules")
+        span.set_attribute("gen_ai.plannedteam.plan", plan.model_dump_json())
+
+        return plan
+
+
+class CachedPlanningStrategy(PlanningStrategy):
+    """
+    Planning strategy that caches the plans of another strategy (usually LLM based), so structurally
+    identical inquiries skip the planner. Plans are keyed on the available agents and on the features
+    returned by `fingerprint`, and evicted in LRU order.
+
+    The inquiry values returned by `fingerprint` (ids of the order, customer, SKUs...) are replaced by
+    placeholders in the cached instructions, then formatted with the values of each new inquiry. Only
+    id tokens are templated: plans where a value is numeric, or cannot be told apart from another one,
+    are not cached. Plans created with feedback are specific to the issues of their inquiry, so they
+    are never cached, and the plan that did not solve the inquiry is evicted.
+
+    Args:
+        inner (PlanningStrategy): The strategy creating the plans on a cache miss.
+        fingerprint (Callable[[str], tuple[dict, dict] | None]): Returns the features and the values
+            of an inquiry, or None when its plan must not be cached.
+        max_plans (int): The maximum number of cached plans.
+    """
+
+    inner: PlanningStrategy
+    fingerprint: Callable[[str], tuple[dict[str, Any], dict[str, Any]] | None]
+    max_plans: int = 256
+
+    _plans: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+
+    async def create_plan(
+        self,
+        agents: list[Agent],
+        history: list["ChatMessageContent"],
+        feedback: str = "",
+    ) -> TeamPlan:
+        span = trace.get_current_span()
+
+        # Without feedback, planning after the team started means an agent asked to replan
+        inquiry = None
+        if history and (feedback or history[-1].role == AuthorRole.USER):
+            inquiry = next(
+                (message.content for message in reversed(history) if message.role == AuthorRole.USER),
+                None,
+            )
+
+        fingerprint = self.fingerprint(inquiry) if inquiry else None
+        if fingerprint is None:
+            plan_cache_misses.add(1)
+            return await self.inner.create_plan(agents, history, feedback)
+
+        features, values = fingerprint
+        key = self._cache_key(agents, features)
+
+        if feedback:
+            # The cached plan did not solve the inquiry, and the new one addresses its specific issues
+            self._plans.pop(key, None)
+            plan_cache_misses.add(1)
+            return await self.inner.create_plan(agents, history, feedback)
+
+        template = self._plans.get(key)
+        if template is not None:
+            try:
+                plan = TeamPlan(
+                    plan=[
+                        TeamPlanStep(
+                            agent_id=step.agent_id,
+                            instructions=step.instructions.format_map(values),
+                            depends_on=step.depends_on,
+                        )
+                        for step in template.plan
+                    ]
+                )
+            except (KeyError, IndexError, ValueError):
+                logger.warning("CachedPlanningStrategy: dropping a plan that does not fit its fingerprint")
+                self._plans.pop(key, None)
+            else:
+                self._plans.move_to_end(key)
+                plan_cache_hits.add(1)
+                logger.info(f"CachedPlanningStrategy: {plan}")
+
+                # Add custom metadata to the current OpenTelemetry span
+                span.set_attribute("gen_ai.plannedteam.planner", "cache")
+                span.set_attribute("gen_ai.plannedteam.plan", plan.model_dump_json())
+
+                return plan
+
+        plan_cache_misses.add(1)
+        plan = await self.inner.create_plan(agents, history, feedback)
+
+        template = _plan_template(plan, values)
+        if template is not None:
+            self._plans[key] = template
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_plans:
+                self._plans.popitem(last=False)
+
+        return plan
+
+    def _cache_key(self, agents: list[Agent], features: dict[str, Any]) -> tuple[str, ...]:
+        return (
+            *sorted(agent.id for agent in agents),
+            json.dumps(features, sort_keys=True, default=str),
+        )
+
+
+def _plan_template(plan: TeamPlan, values: dict[str, Any]) -> TeamPlan | None:
+    """
+    Replace the values in the plan instructions with placeholders.
+    Returns None when a value is ambiguous, or also appears in a way that cannot be templated.
+    """
+    names: dict[str, str | None] = {}
+    for name, value in values.items():
+        text = str(value)
+        if not text:
+            continue
+        # Numbers, e.g. a numeric order id, cannot be told apart from the other numbers of the
+        # instructions, so they are left in place and make the plan uncacheable if they appear
+        if re.fullmatch(r"[\d.,]+", text):
+            names[text] = None
+            continue
+        # The same text for two values cannot be templated back
+        names[text] = name if names.get(text, name) == name else None
+
+    if not names:
+        return plan
+
+    # Longest values first, and whole tokens only, so "SKU-A10" does not match inside "SKU-A100"
+    pattern = re.compile(
+        r"(?<![\w.-])("
+        + "|".join(re.escape(text) for text in sorted(names, key=len, reverse=True))
+        + r")(?![\w-]|\.\d)"
+    )
+
+    # Leftover occurrences, e.g. "SKU-A100x2", would keep the values of the original inquiry
+    leftovers = [
+        re.compile(rf"(?<!\d){re.escape(text)}(?!\d)" if text.isdigit() else re.escape(text))
+        for text in names
+    ]
+
+    steps = []
+    for step in plan.plan:
+        ambiguous = False
+
+        def placeholder(match: re.Match) -> str:
+            nonlocal ambiguous
+            name = names[match.group(1)]
+            if name is None:
+                ambiguous = True
+                return match.group(1)
+            return "{" + name + "}"
+
+        # Escape the literal braces first, as the instructions become format strings
+        instructions = step.instructions.replace("{", "{{").replace("}", "}}")
+        instructions = pattern.sub(placeholder, instructions)
+        if ambiguous:
+            return None
+
+        remainder = re.sub(r"\{\w+\}", "", instructions)
+        if any(leftover.search(remainder) for leftover in leftovers):
+            return None
+        steps.append(
+            TeamPlanStep(agent_id=step.agent_id, instructions=instructions, depends_on=step.depends_on)
+        )
+
+    return TeamPlan(plan=steps)
@@ -0,0 +1,23 @@
+from semantic_kernel.agents import Agent
+
+
+def roster_signature(agents: list[Agent], include_tools: bool = False) -> tuple:
+    """
+    A cheap signature of the agents, their descriptions and (optionally) their plugins,
+    used to rebuild the roster text of the prompts only when the team changes.
+    """
+    return tuple(
+        (
+            agent.id,
+            agent.description,
+            (
+                tuple(
+                    (plugin_name, tuple(plugin.functions))
+                    for plugin_name, plugin in agent.kernel.plugins.items()
+                )
+                if include_tools
+                else ()
+            ),
+        )
+        for agent in agents
+    )
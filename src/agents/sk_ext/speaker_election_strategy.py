@@ -5,6 +5,7 @@ if sys.version_info >= (3, 12):
 else:
     from typing_extensions import override  # pragma: no cover
 
+import re
 from typing import Annotated
 from semantic_kernel.contents.history_reducer.chat_history_reducer import (
     ChatHistoryReducer,
@@ -19,11 +20,22 @@ from semantic_kernel.functions import KernelFunctionFromPrompt
 from semantic_kernel.agents.strategies.selection.selection_strategy import (
     SelectionStrategy,
 )
+from pydantic import PrivateAttr
+from sk_ext.roster import roster_signature
+from sk_ext.usage import record_prompt_usage
 import logging
-from opentelemetry import trace
+from opentelemetry import metrics, trace
 
 logger = logging.getLogger(__name__)
 
+meter = metrics.get_meter(__name__)
+speaker_election_rules = meter.create_counter(
+    "agents.speaker_election.rules", description="Speakers elected locally by the transition rules"
+)
+speaker_election_model = meter.create_counter(
+    "agents.speaker_election.model", description="Speakers elected by the model"
+)
+
 
 class AgentChoiceResponse(KernelBaseModel):
     agent_id: Annotated[
@@ -33,7 +45,10 @@ class AgentChoiceResponse(KernelBaseModel):
     reason: Annotated[str, "Reasoning behind the agent_id selection."]
 
 
+# The static rules and the roster come first, in the system message, so the prompt shares a
+# stable prefix across calls, which the provider can cache. The chat history comes last.
 prompt = """
+<message role="system">
 You are a team orchestrator that uses a chat history to determine the next best speaker in the conversation.
 
 Your task is to return the agent_id of the speaker that is best suited to proceed based on the context provided in the chat history and the description of the agents, in JSON format as shown in the example output section
@@ -48,21 +63,22 @@ Your task is to return the agent_id of the speaker that is best suited to procee
 
 
 ### Example Output
-{{"agent_id": "agent_1", "reason": "Agent 1 is the best speaker for the next turn."}}
+{"agent_id": "agent_1", "reason": "Agent 1 is the best speaker for the next turn."}
 
 
 ### Agents
 
-{agents}
+{{$agents}}
 
 
+BE SURE TO READ AGAIN THE INSTUCTIONS ABOVE BEFORE PROCEEDING.
+</message>
+<message role="user">
 ### Chat History
 
-{history}
-
-
-BE SURE TO READ AGAIN THE INSTUCTIONS ABOVE BEFORE PROCEEDING.       
-        """
+{{$history}}
+</message>
+"""
 
 
 class LastNMessagesHistoryReducer(ChatHistoryReducer):
@@ -85,17 +101,48 @@ class SpeakerElectionStrategy(SelectionStrategy):
     """
     An evolved version of the SelectionStrategy that uses agents descriptions
     and available tools (optiona) to determine the next best speaker in the conversation.
+
+    Turns with an obvious speaker are decided locally, without calling the model:
+    - when the allowed transitions leave a single candidate;
+    - when a single candidate matches the keywords of the user message;
+    - when an agent answered without hinting at any other candidate, the user_agent speaks next.
+    All the other turns are escalated to the model.
+
+    The roster of the agents and the prompt function are built once, and only rebuilt when
+    the agents, their plugins or the allowed transitions change.
     """
 
     kernel: Kernel
     history_reducer: ChatHistoryReducer | None = LastNMessagesHistoryReducer()
     include_tools_descriptions: bool = (False,)
     allowed_transitions: dict["Agent", list["Agent"]] | None = None
+    # The agent standing for the human user, which speaks next once an agent answered
+    user_agent: Agent | None = None
+    # Case-insensitive regular expressions matching the requests handled by each agent_id
+    agent_keywords: dict[str, list[str]] | None = None
+
+    _function: KernelFunctionFromPrompt | None = PrivateAttr(default=None)
+    _roster: tuple[tuple, str] | None = PrivateAttr(default=None)
 
     @override
     async def select_agent(
         self, agents: list["Agent"], history: list[ChatMessageContent]
     ) -> "Agent":
+        span = trace.get_current_span()
+
+        choice = self._select_agent_by_rules(agents, history)
+        if choice is not None:
+            agent, reason = choice
+            logger.info(f"SpeakerElectionStrategy: {agent.id} ({reason})")
+            speaker_election_rules.add(1)
+
+            # Add custom metadata to the current OpenTelemetry span
+            span.set_attribute("gen_ai.team.choice", agent.id)
+            span.set_attribute("gen_ai.team.choice_reason", reason)
+
+            return agent
+
+        speaker_election_model.add(1)
 
         # Reduce the history if needed
         # By default, we will use the last 3 messages to avoid overloading the model
@@ -117,12 +164,13 @@ class SpeakerElectionStrategy(SelectionStrategy):
             if message.role in [AuthorRole.USER, AuthorRole.ASSISTANT]
         ]
 
-        agents_info = self._generate_agents_info(agents)
+        agents_info = self._get_agents_info(agents)
 
         # Invoke the function
         arguments = KernelArguments()
         arguments["agents"] = agents_info
-        arguments["history"] = messages
+        # As text, so it is escaped like the other variables in the message tags
+        arguments["history"] = str(messages)
 
         execution_settings = {}
         # See https://devblogs.microsoft.com/semantic-kernel/using-json-schema-for-structured-output-in-python-for-openai-models/
@@ -131,16 +179,17 @@ class SpeakerElectionStrategy(SelectionStrategy):
         # Set temperature to 0 to ensure more deterministic results
         execution_settings["temperature"] = 0
 
-        input_prompt = prompt.format(agents=agents_info, history=messages)
-        function = KernelFunctionFromPrompt(
-            function_name="SpeakerElection", prompt=input_prompt
-        )
-        result = await function.invoke(
+        if self._function is None:
+            self._function = KernelFunctionFromPrompt(
+                function_name="SpeakerElection", prompt=prompt
+            )
+        result = await self._function.invoke(
             kernel=self.kernel,
             arguments=arguments,
             execution_settings=execution_settings,
         )
         logger.info(f"SpeakerElectionStrategy: {result}")
+        record_prompt_usage("SpeakerElection", result)
         content = (
             # Strip markdown formatting if present
             result.value[0]
@@ -151,12 +200,87 @@ class SpeakerElectionStrategy(SelectionStrategy):
         parsed_result = AgentChoiceResponse.model_validate_json(content)
 
         # Add custom metadata to the current OpenTelemetry span
-        span = trace.get_current_span()
         span.set_attribute("gen_ai.team.choice", parsed_result.agent_id)
         span.set_attribute("gen_ai.team.choice_reason", parsed_result.reason)
 
         return next(agent for agent in agents if agent.id == parsed_result.agent_id)
 
+    def _select_agent_by_rules(
+        self, agents: list["Agent"], history: list[ChatMessageContent]
+    ) -> tuple["Agent", str] | None:
+        """
+        Select the next speaker when the transitions or keywords leave no doubt.
+
+        :return: The selected agent and the reason of the selection, or None when the model must decide.
+        """
+        # Tool calls and results carry no content to decide on
+        last_message = next(
+            (
+                message
+                for message in reversed(history)
+                if message.role in [AuthorRole.USER, AuthorRole.ASSISTANT] and message.content
+            ),
+            None,
+        )
+        if last_message is None:
+            return None
+
+        # The last speaker is None when the message comes from the human user
+        speaker = None
+        if last_message.role == AuthorRole.ASSISTANT:
+            speaker = next(
+                (agent for agent in agents if last_message.name in (agent.name, agent.id)),
+                None,
+            )
+
+        candidates = agents
+        if speaker is not None and self.allowed_transitions and speaker in self.allowed_transitions:
+            candidates = [agent for agent in self.allowed_transitions[speaker] if agent in agents]
+        if len(candidates) == 1:
+            if speaker is None:
+                return candidates[0], "Only candidate agent"
+            return candidates[0], f"Only allowed transition from {speaker.id}"
+
+        # Agents matching the last message, other than the one who wrote it
+        matches = [
+            agent
+            for agent in candidates
+            if agent != speaker
+            and agent != self.user_agent
+            and self._matches_keywords(agent, last_message.content)
+        ]
+
+        if speaker is None or speaker == self.user_agent:
+            if len(matches) == 1:
+                return matches[0], f"The user request matches the keywords of {matches[0].id}"
+        elif self.user_agent in candidates and not matches:
+            return self.user_agent, f"{speaker.id} answered without handing over to another agent"
+
+        return None
+
+    def _matches_keywords(self, agent: "Agent", content: str) -> bool:
+        # Mentioning an agent is the most explicit hand over
+        if agent.id in content or (agent.name and agent.name in content):
+            return True
+        if not self.agent_keywords:
+            return False
+        return any(
+            re.search(pattern, content, re.IGNORECASE)
+            for pattern in self.agent_keywords.get(agent.id, [])
+        )
+
+    def _get_agents_info(self, agents: list["Agent"]) -> str:
+        signature = (
+            roster_signature(agents, self.include_tools_descriptions),
+            tuple(
+                (agent.id, tuple(next_agent.id for next_agent in next_agents))
+                for agent, next_agents in (self.allowed_transitions or {}).items()
+            ),
+        )
+        if self._roster is None or self._roster[0] != signature:
+            self._roster = (signature, self._generate_agents_info(agents))
+        return self._roster[1]
+
     def _generate_agents_info(self, agents: list["Agent"]) -> str:
         """
         Generate the agents info string to be used in the prompt. This includes
@@ -0,0 +1,57 @@
+import logging
+
+from semantic_kernel.kernel import Kernel
+from semantic_kernel.functions.kernel_arguments import KernelArguments
+from semantic_kernel.functions.kernel_function import KernelFunction
+from semantic_kernel.kernel_pydantic import KernelBaseModel
+from semantic_kernel.contents.chat_message_content import ChatMessageContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import (
+    ChatHistoryReducer,
+)
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from sk_ext.history_reducer import reduce_messages
+from sk_ext.usage import record_prompt_usage
+
+logger: logging.Logger = logging.getLogger(__name__)
+
+
+class SummaryStrategy(KernelBaseModel):
+    """A strategy for summarizing the messages of a conversation that are no longer sent to the agents."""
+
+    kernel: Kernel
+
+    async def summarize(self, summary: str, messages: list["ChatMessageContent"]) -> str:
+        """Return the summary extended with the given messages, which follow the ones it covers."""
+        raise NotImplementedError("summarize not implemented")
+
+
+class KernelFunctionSummaryStrategy(SummaryStrategy):
+    """A strategy that summarizes the messages with a kernel function, given the previous summary."""
+
+    function: KernelFunction
+    history_reducer: ChatHistoryReducer | None = None
+
+    async def summarize(self, summary: str, messages: list["ChatMessageContent"]) -> str:
+        # Reduce the messages if needed
+        messages = await reduce_messages(self.history_reducer, messages)
+
+        arguments = KernelArguments()
+        arguments["summary"] = summary
+        # As text, so it is escaped like the other variables in the message tags
+        arguments["messages"] = str(
+            [
+                {
+                    "role": str(message.role),
+                    "content": message.content,
+                    "name": message.name or "user",
+                }
+                for message in messages
+                if message.role in [AuthorRole.USER, AuthorRole.ASSISTANT] and message.content
+            ]
+        )
+
+        result = await self.function.invoke(kernel=self.kernel, arguments=arguments)
+        logger.debug(f"SummaryStrategy: {result}")
+        record_prompt_usage(self.function.name, result)
+        return str(result.value[0].content).strip()
@@ -111,8 +111,13 @@ class Team(Agent):
         history: ChatHistory,
         arguments: KernelArguments | None = None,
         kernel: "Kernel | None" = None,
+        stream: bool = False,
         **kwargs: Any,
     ) -> AsyncIterable[ChatMessageContent]:
+        """
+        Let the selected agents speak until the termination strategy stops the team, yielding
+        their visible messages or, when streaming, the chunks of their messages as they are produced.
+        """
         # In case the agent is invoked multiple times
         self.is_complete = False
 
@@ -131,21 +136,33 @@ class Team(Agent):
                 logger.error(f"Failed to select agent: {ex}")
                 raise AgentChatException("Failed to select agent") from ex
 
-            async for is_visible, message in channel.invoke(selected_agent):
-                history.add_message(message)
-                logger.info(f"Agent {selected_agent.id} sent message: {message}")
-                if message.role == AuthorRole.ASSISTANT:
-                    task = self.termination_strategy.should_terminate(
-                        selected_agent, history.messages
-                    )
-                    self.is_complete = await task
+            if stream:
+                messages: list[ChatMessageContent] = []
+                async for chunk in channel.invoke_stream(selected_agent, messages):
+                    yield chunk
 
-                if is_visible:
-                    yield message
+                # The complete messages were already yielded as chunks
+                for message in messages:
+                    await self._add_message(selected_agent, history, message)
+            else:
+                async for is_visible, message in channel.invoke(selected_agent):
+                    await self._add_message(selected_agent, history, message)
+
+                    if is_visible:
+                        yield message
 
             if self.is_complete:
                 break
 
+    async def _add_message(
+        self, agent: Agent, history: ChatHistory, message: ChatMessageContent
+    ) -> None:
+        history.add_message(message)
+        logger.info(f"Agent {agent.id} sent message: {message}")
+        if message.role == AuthorRole.ASSISTANT:
+            task = self.termination_strategy.should_terminate(agent, history.messages)
+            self.is_complete = await task
+
     @trace_agent_invocation
     async def invoke_stream(
         self,
@@ -154,27 +171,16 @@ class Team(Agent):
         kernel: "Kernel | None" = None,
         **kwargs: Any,
     ) -> AsyncIterable[StreamingChatMessageContent]:
-        # TODO REVIEW!!
-
-        # Channel required to communicate with agents
-        channel = await self.create_channel()
-        await channel.receive(history.messages)
-
-        # TODO: check if it makes sense to have a termination strategy here
-        for _ in range(self.termination_strategy.maximum_iterations):
-            try:
-                selected_agent = await self.selection_strategy.next(
-                    self.agents, history.messages
-                )
-            # TODO: possible handle a case when no agent is selected
-            except Exception as ex:
-                logger.error(f"Failed to select agent: {ex}")
-                raise AgentChatException("Failed to select agent") from ex
-
-            messages: list[ChatMessageContent] = []
+        """Invoke the team in streaming mode, with the same selection and termination as invoke.
 
-            async for message in channel.invoke_stream(selected_agent, messages):
-                yield message
+        Args:
+            history: The chat history.
+            arguments: The kernel arguments.
+            kernel: The kernel instance.
+            kwargs: The keyword arguments.
 
-            for message in messages:
-                history.messages.append(message)
+        Returns:
+            An async iterable of StreamingChatMessageContent.
+        """
+        async for response in self._inner_invoke(history, arguments, kernel, stream=True, **kwargs):
+            yield response
@@ -0,0 +1,39 @@
+import logging
+
+from opentelemetry import metrics, trace
+from semantic_kernel.functions.function_result import FunctionResult
+
+logger = logging.getLogger(__name__)
+
+meter = metrics.get_meter(__name__)
+prompt_tokens = meter.create_counter(
+    "agents.prompt.tokens", description="Prompt tokens sent by the orchestration strategies"
+)
+prompt_cached_tokens = meter.create_counter(
+    "agents.prompt.cached_tokens",
+    description="Prompt tokens of the orchestration strategies served from the provider prompt cache",
+)
+
+
+def record_prompt_usage(function_name: str, result: FunctionResult) -> None:
+    """
+    Report the prompt and cached token counts of a kernel function call, as metrics and
+    attributes of the current span. Semantic Kernel does not surface the cached tokens,
+    so they are read from the raw OpenAI response.
+    """
+    usage = None
+    if result.value:
+        usage = getattr(result.value[0].inner_content, "usage", None)
+    if usage is None:
+        return
+
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = (details.cached_tokens if details is not None else None) or 0
+    attributes = {"function": function_name}
+    prompt_tokens.add(usage.prompt_tokens, attributes)
+    prompt_cached_tokens.add(cached_tokens, attributes)
+
+    span = trace.get_current_span()
+    span.set_attribute("gen_ai.usage.input_tokens", usage.prompt_tokens)
+    span.set_attribute("gen_ai.usage.cached_input_tokens", cached_tokens)
+    logger.info(f"{function_name}: {cached_tokens}/{usage.prompt_tokens} prompt tokens cached")
@@ -22,6 +22,15 @@ class Config:
     DATA_STORE_NAME = os.getenv("DATA_STORE_NAME", "data")
     USE_DAPR = os.getenv("DAPR_HTTP_PORT", "") != ""
     LOCAL_DATA_FOLDER = os.getenv("LOCAL_DATA_FOLDER", "data/store")
+    # Keep parsed local partitions in memory, reloading them only when the file changes
+    LOCAL_DATA_CACHE = os.getenv("LOCAL_DATA_CACHE", "true").lower() == "true"
+    # Number of journal entries after which a local partition is compacted into its snapshot
+    LOCAL_DATA_COMPACT_THRESHOLD = int(os.getenv("LOCAL_DATA_COMPACT_THRESHOLD", "500"))
+    # Seconds before the SKU to facility index is rebuilt, for stores that cannot report changes
+    INVENTORY_INDEX_TTL = float(os.getenv("INVENTORY_INDEX_TTL", "60"))
+    # Read-through cache for the reference partitions, shared by all plugins (TTL 0 disables it)
+    CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", "300"))
+    CATALOG_CACHE_MAX_ITEMS = int(os.getenv("CATALOG_CACHE_MAX_ITEMS", "10000"))
 
     COSMOSDB_ENDPOINT = os.getenv("COSMOSDB_ENDPOINT")
     COSMOSDB_DATABASE = os.getenv("COSMOSDB_DATABASE")
@@ -29,8 +38,28 @@ class Config:
     COSMOSDB_STATE_CONTAINER = os.getenv("COSMOSDB_STATE_CONTAINER")
 
     PLANNING_MODEL = os.environ.get("AZURE_OPENAI_PLANNING_DEPLOYMENT_NAME", "o4-mini")
+    # Plans of the planner model reused for structurally identical orders (0 disables the cache)
+    PLAN_CACHE_MAX_PLANS = int(os.getenv("PLAN_CACHE_MAX_PLANS", "256"))
+    # Token budget of the history sent to the planning, speaker election and feedback prompts
+    ORCHESTRATION_HISTORY_MAX_TOKENS = int(os.getenv("ORCHESTRATION_HISTORY_MAX_TOKENS", "8000"))
+    # Seconds between the streaming updates sent to a conversation (Teams allows about one per second)
+    NOTIFY_STREAM_INTERVAL = float(os.getenv("NOTIFY_STREAM_INTERVAL", "1.0"))
+    # Fraction of the team invocations whose plan steps are logged to "sk_ext.trace" at DEBUG level
+    DEBUG_TRACE_SAMPLE_RATE = float(os.getenv("DEBUG_TRACE_SAMPLE_RATE", "0"))
+    # Messages per segment of the persisted actor histories, only the last segments are written on save
+    ACTOR_HISTORY_SEGMENT_SIZE = int(os.getenv("ACTOR_HISTORY_SEGMENT_SIZE", "20"))
+    # Segments of the actor histories loaded for a call, besides the first message (0 loads them all)
+    ACTOR_HISTORY_WINDOW_SEGMENTS = int(os.getenv("ACTOR_HISTORY_WINDOW_SEGMENTS", "5"))
+    # Summarize the messages before the loaded window with the model, instead of only counting them
+    ACTOR_HISTORY_SUMMARY = os.getenv("ACTOR_HISTORY_SUMMARY", "true").lower() == "true"
+    # Codec of new actor state values: msgpack, msgpack+zstd, msgpack+zlib or json (state in JSON is always readable)
+    ACTOR_STATE_CODEC = os.getenv("ACTOR_STATE_CODEC", "msgpack+zstd")
+    # Tool results longer than this are stored out of the actor histories after their turn (0 keeps them)
+    ACTOR_TOOL_RESULT_MAX_LENGTH = int(os.getenv("ACTOR_TOOL_RESULT_MAX_LENGTH", "2000"))
 
     NOTIFY_USER_IDS = [uid for uid in os.getenv("NOTIFY_USER_IDS", "").split(",") if uid]
+    # Users notified concurrently of an order event
+    NOTIFY_CONCURRENCY = int(os.getenv("NOTIFY_CONCURRENCY", "16"))
 
     def validate(self):
         # Validate the configuration
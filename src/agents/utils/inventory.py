@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import time
+
+from .config import config
+from .query import Query
+from .store import DataStore
+
+logger = logging.getLogger(__name__)
+
+
+class InventoryIndex:
+    """
+    Inverted index from SKU to the facilities stocking it, built from the facility partition.
+    It is shared by all plugins and rebuilt when the partition changes: immediately for
+    stores that expose a partition version, otherwise once the TTL expires.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[str, list[dict]] = {}
+        self._version = None
+        self._loaded_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    def _is_fresh(self, version) -> bool:
+        if self._loaded_at is None:
+            return False
+        if version is not None:
+            return version == self._version
+        return time.monotonic() - self._loaded_at < self.ttl
+
+    async def _refresh(self, data_store: DataStore) -> None:
+        version = data_store.partition_version("facility")
+        if self._is_fresh(version):
+            return
+
+        async with self._lock:
+            # Another task may have rebuilt the index while we waited
+            if self._is_fresh(version):
+                return
+
+            facilities = await data_store.query_data(Query(), "facility")
+            entries: dict[str, list[dict]] = {}
+            for facility in facilities:
+                for sku_availability in facility.get("skuAvailability", []):
+                    entries.setdefault(sku_availability["sku"], []).append(
+                        {
+                            "facility_id": facility["id"],
+                            "name": facility.get("name", "Unknown"),
+                            "available": sku_availability["availableQuantity"],
+                            "delivery_eta": sku_availability.get("deliveryETA"),
+                        }
+                    )
+
+            self._entries = entries
+            self._version = version
+            self._loaded_at = time.monotonic()
+            logger.debug(
+                f"Inventory index rebuilt from {len(facilities)} facilities ({len(entries)} SKUs)"
+            )
+
+    async def lookup(self, data_store: DataStore, skus: list[str]) -> dict[str, list[dict]]:
+        """Get the facilities stocking each of the given SKUs."""
+        await self._refresh(data_store)
+        return {sku: list(self._entries.get(sku, [])) for sku in skus}
+
+    async def check_availability(
+        self, data_store: DataStore, requested: list[tuple[str, int]]
+    ) -> dict[str, dict]:
+        """
+        Check the requested (sku, quantity) pairs against the stock of all facilities.
+
+        Returns:
+            A dictionary with availability status and locations for each SKU
+        """
+        locations_by_sku = await self.lookup(data_store, [sku for sku, _ in requested])
+
+        results = {}
+        for sku_id, quantity in requested:
+            locations = locations_by_sku[sku_id]
+            total_available = sum(location["available"] for location in locations)
+            results[sku_id] = {
+                "requested": quantity,
+                "available": total_available,
+                "is_available": total_available >= quantity,
+                "locations": locations,
+            }
+        return results
+
+
+inventory_index = InventoryIndex(ttl=config.INVENTORY_INDEX_TTL)
@@ -1,22 +1,47 @@
+import asyncio
 import os
+import time
 import requests
 from azure.identity import ClientSecretCredential
 import logging
 logger = logging.getLogger(__name__)
 
+_credential: ClientSecretCredential | None = None
+
 # Get an Azure AD token with client credentials
 
 
 def get_token():
-    credential = ClientSecretCredential(
-        tenant_id=os.getenv("BOT_TENANT_ID"),
-        client_id=os.getenv("BOT_APP_ID"),
-        client_secret=os.getenv("BOT_PASSWORD")
-    )
-    token = credential.get_token("https://api.botframework.com/.default")
+    global _credential
+    # NOTE the credential caches the token until it expires
+    if _credential is None:
+        _credential = ClientSecretCredential(
+            tenant_id=os.getenv("BOT_TENANT_ID"),
+            client_id=os.getenv("BOT_APP_ID"),
+            client_secret=os.getenv("BOT_PASSWORD")
+        )
+    token = _credential.get_token("https://api.botframework.com/.default")
     return token.token
 
 
+def post_activity(conversation_id, activity):
+    """
+    Posts an activity to a Teams conversation.
+
+    Returns:
+        dict: The response from the Bot Connector API.
+    """
+    url = f"https://smba.trafficmanager.net/teams/v3/conversations/{conversation_id}/activities"
+    token = get_token()
+    headers = {
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json"
+    }
+    response = requests.post(url, headers=headers, json=activity)
+    response.raise_for_status()
+    return response.json()
+
+
 def notify(conversation_id, content, from_user="user1"):
     """
     Sends a message to a DirectLine conversation.
@@ -29,12 +54,6 @@ def notify(conversation_id, content, from_user="user1"):
     Returns:
         dict: The response from the DirectLine API.
     """
-    url = f"https://smba.trafficmanager.net/teams/v3/conversations/{conversation_id}/activities"
-    token = get_token()
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json"
-    }
     payload = {
         "type": "message",
         "from": {"id": from_user},
@@ -57,10 +76,61 @@ def notify(conversation_id, content, from_user="user1"):
         ]
     }
     try:
-        response = requests.post(url, headers=headers, json=payload)
-        response.raise_for_status()
-        logger.debug("Notification sent successfully: %s", response.json())
-        return response.json()
+        result = post_activity(conversation_id, payload)
+        logger.debug("Notification sent successfully: %s", result)
+        return result
     except requests.exceptions.RequestException as e:
         logger.error("Failed to send notification: %s", str(e))
         raise
+
+
+class NotificationStream:
+    """
+    Streams a message to a Teams conversation while it is generated, following the Teams streaming protocol:
+    typing activities with the text so far, at most one per interval. The final message, which can be
+    an adaptive card, is sent by the bot with the stream id, in reply to the user message.
+    Streaming is only supported in personal chats.
+    See https://learn.microsoft.com/microsoftteams/platform/bots/streaming-ux
+
+    Updates are sent in the background, so appending never waits for the network.
+    """
+
+    def __init__(self, conversation_id, from_user="user1", interval=1.0):
+        self.conversation_id = conversation_id
+        self.from_user = from_user
+        self.interval = interval
+        self.text = ""
+        self.stream_id = None
+        self.sequence = 0
+        self._last_update = 0.0
+        self._pending: asyncio.Task | None = None
+
+    def append(self, text):
+        self.text += text
+        if (self._pending is None or self._pending.done()) and time.monotonic() - self._last_update >= self.interval:
+            self._last_update = time.monotonic()
+            self._pending = asyncio.create_task(self._send_update(self.text))
+
+    async def finish(self):
+        """Waits for the pending update (if any), and returns the stream id, or None if no update was sent."""
+        if self._pending is not None:
+            await asyncio.gather(self._pending, return_exceptions=True)
+        return self.stream_id
+
+    async def _send_update(self, text):
+        self.sequence += 1
+        stream_info = {"type": "streaminfo", "streamType": "streaming", "streamSequence": self.sequence}
+        if self.stream_id is not None:
+            stream_info["streamId"] = self.stream_id
+        try:
+            result = await asyncio.to_thread(
+                post_activity,
+                self.conversation_id,
+                {"type": "typing", "from": {"id": self.from_user}, "text": text, "entities": [stream_info]},
+            )
+            # The first update starts the stream
+            if self.stream_id is None:
+                self.stream_id = result.get("id")
+        except requests.exceptions.RequestException as e:
+            # The final message still delivers the whole answer
+            logger.warning("Failed to send streaming update: %s", str(e))
@@ -0,0 +1,179 @@
+import operator
+from typing import Any
+
+# Comparison operators supported by Query.where, with their in-memory equivalent
+OPERATORS = {
+    "=": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+
+# Subset of conditions the Dapr state query API can evaluate server-side
+DAPR_OPERATORS = {"=": "EQ"}
+
+
+class Query:
+    """
+    A parameterized query over a single partition, built once and translated to each
+    data store dialect: Cosmos SQL with parameters, Dapr state queries, or an
+    in-memory predicate for local data.
+
+    Fields are dotted paths into the item (e.g. "pricesheet.updated").
+
+    Example:
+        Query().where_in("id", ["SKU-A100", "SKU-A102"]).order_by("id").limit(10)
+    """
+
+    def __init__(self):
+        self.conditions: list[tuple] = []
+        self.sort: tuple[str, bool] | None = None
+        self.max_items: int | None = None
+
+    def where(self, field: str, op: str, value: Any) -> "Query":
+        """Filter on a comparison between a field and a value."""
+        if op not in OPERATORS:
+            raise ValueError(f"Unsupported query operator: {op}")
+        self.conditions.append(("compare", field, op, value))
+        return self
+
+    def where_in(self, field: str, values: list[Any]) -> "Query":
+        """Filter on a field being one of the given values."""
+        self.conditions.append(("in", field, list(values)))
+        return self
+
+    def where_any_in(self, array_field: str, field: str, values: list[Any]) -> "Query":
+        """Filter on any element of an array field having its field in the given values."""
+        self.conditions.append(("any_in", array_field, field, list(values)))
+        return self
+
+    def order_by(self, field: str, descending: bool = False) -> "Query":
+        self.sort = (field, descending)
+        return self
+
+    def limit(self, count: int) -> "Query":
+        self.max_items = count
+        return self
+
+    def to_sql(self) -> tuple[str, list[dict]]:
+        """Translate the query to Cosmos DB SQL, returning the query text and its parameters."""
+        parameters: list[dict] = []
+
+        def param(value: Any) -> str:
+            name = f"@p{len(parameters)}"
+            parameters.append({"name": name, "value": value})
+            return name
+
+        select = "SELECT"
+        if self.max_items is not None:
+            select += f" TOP {param(self.max_items)}"
+
+        clauses = []
+        for condition in self.conditions:
+            kind = condition[0]
+            if kind == "compare":
+                _, field, op, value = condition
+                clauses.append(f"c.{field} {op} {param(value)}")
+            elif kind == "in":
+                _, field, values = condition
+                clauses.append(f"ARRAY_CONTAINS({param(values)}, c.{field})")
+            elif kind == "any_in":
+                _, array_field, field, values = condition
+                clauses.append(
+                    f"EXISTS(SELECT VALUE x FROM x IN c.{array_field} WHERE ARRAY_CONTAINS({param(values)}, x.{field}))"
+                )
+
+        sql = f"{select} * FROM c"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if self.sort is not None:
+            field, descending = self.sort
+            sql += f" ORDER BY c.{field} {'DESC' if descending else 'ASC'}"
+
+        return sql, parameters
+
+    def to_dapr(self) -> tuple[dict, bool]:
+        """
+        Translate the query to the Dapr state query format.
+        Returns the query and whether it is complete; when it is not, the results
+        must still be filtered with `apply`, as some conditions cannot run server-side.
+        """
+        filters = []
+        complete = True
+        for condition in self.conditions:
+            kind = condition[0]
+            if kind == "compare" and condition[2] in DAPR_OPERATORS:
+                _, field, op, value = condition
+                filters.append({DAPR_OPERATORS[op]: {field: value}})
+            elif kind == "in":
+                _, field, values = condition
+                filters.append({"IN": {field: values}})
+            else:
+                complete = False
+
+        query: dict = {}
+        if len(filters) == 1:
+            query["filter"] = filters[0]
+        elif filters:
+            query["filter"] = {"AND": filters}
+        if self.sort is not None:
+            field, descending = self.sort
+            query["sort"] = [{"key": field, "order": "DESC" if descending else "ASC"}]
+        # NOTE paging before client-side filtering would drop matching items
+        if complete and self.max_items is not None:
+            query["page"] = {"limit": self.max_items}
+
+        return query, complete
+
+    def matches(self, item: dict) -> bool:
+        """Evaluate the query conditions against an in-memory item."""
+        if not isinstance(item, dict):
+            return False
+
+        for condition in self.conditions:
+            kind = condition[0]
+            if kind == "compare":
+                _, field, op, value = condition
+                actual = _resolve(item, field)
+                try:
+                    if actual is None or not OPERATORS[op](actual, value):
+                        return False
+                except TypeError:
+                    return False
+            elif kind == "in":
+                _, field, values = condition
+                if _resolve(item, field) not in values:
+                    return False
+            elif kind == "any_in":
+                _, array_field, field, values = condition
+                elements = _resolve(item, array_field) or []
+                if not any(_resolve(element, field) in values for element in elements):
+                    return False
+
+        return True
+
+    def apply(self, items: list[dict]) -> list[dict]:
+        """Filter, sort and limit in-memory items."""
+        results = [item for item in items if self.matches(item)]
+
+        if self.sort is not None:
+            field, descending = self.sort
+            results.sort(
+                # Missing values sort last (first when descending)
+                key=lambda item: (_resolve(item, field) is None, _resolve(item, field)),
+                reverse=descending,
+            )
+        if self.max_items is not None:
+            results = results[: self.max_items]
+
+        return results
+
+
+def _resolve(item: Any, field: str) -> Any:
+    for part in field.split("."):
+        if not isinstance(item, dict):
+            return None
+        item = item.get(part)
+    return item
@@ -1,172 +1,482 @@
 from abc import ABC
+import asyncio
+from collections import OrderedDict
+from contextlib import contextmanager
 import json
 import os
 import logging
-from dapr.clients import DaprClient
+import time
+from dapr.aio.clients import DaprClient
+from dapr.clients.grpc._state import StateItem
 from azure.identity import DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 from azure.cosmos import CosmosClient
+from azure.cosmos.aio import CosmosClient as AsyncCosmosClient
+from azure.cosmos.aio import ContainerProxy
 from .config import config
+from .query import Query
 from azure.cosmos.exceptions import CosmosResourceNotFoundError
+from opentelemetry import metrics
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # NOTE file locking is not available on Windows, local store is single process there
+    fcntl = None
 
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of operations in a Cosmos DB transactional batch
+COSMOS_MAX_BATCH_OPERATIONS = 100
+
+# Reference data partitions, read often and rarely written
+CATALOG_PARTITIONS = ["sku", "facility", "discount", "customer"]
+
+meter = metrics.get_meter(__name__)
+catalog_cache_hits = meter.create_counter(
+    "agents.catalog_cache.hits", description="Catalog lookups served from the cache"
+)
+catalog_cache_misses = meter.create_counter(
+    "agents.catalog_cache.misses", description="Catalog lookups that reached the data store"
+)
+
 
 class DataStore(ABC):
     async def get_data(self, key: str, partition_key: str) -> dict:
         pass
 
-    async def query_data(self, query: any, partition_key) -> list[dict]:
+    async def get_many(self, keys: list[str], partition_key: str) -> list[dict]:
+        """
+        Get several items from the same partition, in the order of the keys.
+        Missing keys are returned as None. Stores should override this with a bulk read.
+        """
+        return list(
+            await asyncio.gather(*[self.get_data(key, partition_key) for key in keys])
+        )
+
+    async def query_data(self, query: str | Query, partition_key) -> list[dict]:
+        """
+        Query items in a partition. Prefer a parameterized `Query`, so each store can
+        filter server-side; raw query strings are passed through as-is.
+        """
         pass
 
     async def save_data(self, key: str, partition_key: str, data: dict) -> None:
         pass
 
+    async def save_many(self, items: dict[str, dict], partition_key: str) -> None:
+        """
+        Save several items, keyed by id, to the same partition.
+        Stores should override this with a bulk write.
+        """
+        await asyncio.gather(
+            *[self.save_data(key, partition_key, data) for key, data in items.items()]
+        )
+
     async def delete_data(self, key: str, partition_key: str) -> None:
         pass
 
+    def partition_version(self, partition_key: str) -> object | None:
+        """
+        Get a cheap token that changes whenever the partition changes, used to refresh
+        derived caches. Returns None when the store cannot tell, callers then rely on a TTL.
+        """
+        return None
+
 
 class DaprDataStore(DataStore):
+    """
+    Data store backed by a Dapr state store.
+    A single long-lived async client (and gRPC channel) is shared by all instances in the process.
+    """
+
+    _client: DaprClient | None = None
+
+    @classmethod
+    def _get_client(cls) -> DaprClient:
+        # NOTE created lazily, so the channel is bound to the running event loop
+        if cls._client is None:
+            cls._client = DaprClient()
+        return cls._client
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared client, if it was ever created."""
+        if cls._client is not None:
+            await cls._client.close()
+        cls._client = None
+
     async def get_data(self, key: str, partition_key: str) -> dict:
-        with DaprClient() as client:
-            # Get the discount from a hypothetical service using Dapr state
-            return client.get_state(
-                store_name=config.DATA_STORE_NAME,
-                key=key,
-                metadata={"partitionKey": partition_key},
-            ).json()
-
-    async def query_data(self, query: any, partition_key: str) -> list[dict]:
-        with DaprClient() as client:
-            # Query the discount from a hypothetical service using Dapr state
-            # NOTE this is still alpha API and may change in the future
-            response = client.query_state(
-                store_name=config.DATA_STORE_NAME,
-                query=json.dumps(query),
-                states_metadata={"partitionKey": partition_key},
-            )
-            logger.info(f"Query response: {response.results}")
+        response = await self._get_client().get_state(
+            store_name=config.DATA_STORE_NAME,
+            key=key,
+            state_metadata={"partitionKey": partition_key},
+        )
+        # Missing keys come back with empty data
+        return response.json() if response.data else None
+
+    async def get_many(self, keys: list[str], partition_key: str) -> list[dict]:
+        """Get several items in a single round trip, missing keys are returned as None."""
+        response = await self._get_client().get_bulk_state(
+            store_name=config.DATA_STORE_NAME,
+            keys=keys,
+            states_metadata={"partitionKey": partition_key},
+        )
+        items = {item.key: item.json() for item in response.items if item.data}
+        return [items.get(key) for key in keys]
+
+    async def query_data(self, query: str | Query, partition_key: str) -> list[dict]:
+        complete = True
+        if isinstance(query, Query):
+            query_body, complete = query.to_dapr()
+        else:
+            query_body = query
+
+        # NOTE this is still alpha API and may change in the future
+        response = await self._get_client().query_state(
+            store_name=config.DATA_STORE_NAME,
+            query=json.dumps(query_body),
+            states_metadata={"partitionKey": partition_key},
+        )
+        logger.info(f"Query response: {response.results}")
 
-            return [item.json() for item in response.results]
+        results = [item.json() for item in response.results]
+        if not complete:
+            # Apply the conditions Dapr cannot evaluate
+            results = query.apply(results)
+        return results
 
     async def save_data(self, key: str, partition_key: str, data: dict) -> None:
-        with DaprClient() as client:
-            # Save the discount to a hypothetical service using Dapr state
-            client.save_state(
-                store_name=config.DATA_STORE_NAME,
-                key=key,
-                value=json.dumps(data),
-                metadata={"partitionKey": partition_key},
-            )
+        await self._get_client().save_state(
+            store_name=config.DATA_STORE_NAME,
+            key=key,
+            value=json.dumps(data),
+            state_metadata={"partitionKey": partition_key},
+        )
+
+    async def save_many(self, items: dict[str, dict], partition_key: str) -> None:
+        """Save several items, keyed by id, in a single round trip."""
+        await self._get_client().save_bulk_state(
+            store_name=config.DATA_STORE_NAME,
+            states=[
+                StateItem(
+                    key=key,
+                    value=json.dumps(data),
+                    metadata={"partitionKey": partition_key},
+                )
+                for key, data in items.items()
+            ],
+        )
 
     async def delete_data(self, key: str, partition_key: str) -> None:
-        with DaprClient() as client:
-            # Delete the discount from a hypothetical service using Dapr state
-            client.delete_state(
-                store_name=config.DATA_STORE_NAME,
-                key=key,
-                metadata={"partitionKey": partition_key},
-            )
+        await self._get_client().delete_state(
+            store_name=config.DATA_STORE_NAME,
+            key=key,
+            state_metadata={"partitionKey": partition_key},
+        )
 
 
 class CosmosDataStore(DataStore):
-    def __init__(self):
-        super().__init__()
-        self.client = CosmosClient(
-            url=config.COSMOSDB_ENDPOINT,
-            credential=DefaultAzureCredential(),
-        )
-        self.database = self.client.get_database_client(config.COSMOSDB_DATABASE)
-        self.container = self.database.get_container_client(
-            config.COSMOSDB_DATA_CONTAINER
-        )
+    """
+    Data store backed by Cosmos DB, using the async SDK so calls do not block the event loop.
+    A single client (and connection pool) is shared by all instances in the process.
+    """
+
+    _client: AsyncCosmosClient | None = None
+    _credential: AsyncDefaultAzureCredential | None = None
+    _container: ContainerProxy | None = None
+
+    @classmethod
+    def _get_container(cls) -> ContainerProxy:
+        # NOTE created lazily, so the client is bound to the running event loop
+        if cls._container is None:
+            cls._credential = AsyncDefaultAzureCredential()
+            cls._client = AsyncCosmosClient(
+                url=config.COSMOSDB_ENDPOINT,
+                credential=cls._credential,
+            )
+            database = cls._client.get_database_client(config.COSMOSDB_DATABASE)
+            cls._container = database.get_container_client(
+                config.COSMOSDB_DATA_CONTAINER
+            )
+        return cls._container
+
+    @classmethod
+    async def close(cls) -> None:
+        """Close the shared client, if it was ever created."""
+        if cls._client is not None:
+            await cls._client.close()
+            await cls._credential.close()
+        cls._client = None
+        cls._credential = None
+        cls._container = None
 
     async def get_data(self, key: str, partition_key: str) -> dict:
 
         try:
-            return self.container.read_item(item=key, partition_key=partition_key)
+            return await self._get_container().read_item(
+                item=key, partition_key=partition_key
+            )
         except CosmosResourceNotFoundError:
             return None
 
-    async def query_data(self, query: any, partition_key: str) -> list[dict]:
-        # Query the discount from a hypothetical service using Dapr state
-        response = self.container.query_items(query=query, partition_key=partition_key)
-        return [item for item in response]
+    async def get_many(self, keys: list[str], partition_key: str) -> list[dict]:
+        # Single-partition query, one round trip for all the keys
+        results = await self.query_data(Query().where_in("id", keys), partition_key)
+        items = {item["id"]: item for item in results}
+        return [items.get(key) for key in keys]
+
+    async def query_data(self, query: str | Query, partition_key: str) -> list[dict]:
+        parameters = None
+        if isinstance(query, Query):
+            query, parameters = query.to_sql()
+
+        response = self._get_container().query_items(
+            query=query, parameters=parameters, partition_key=partition_key
+        )
+        return [item async for item in response]
 
     async def save_data(self, key: str, partition_key: str, data: dict) -> None:
-        # Save the discount to a hypothetical service using Dapr state
         data["id"] = key
         data["partitionKey"] = partition_key
-        self.container.upsert_item(data)
+        await self._get_container().upsert_item(data)
+
+    async def save_many(self, items: dict[str, dict], partition_key: str) -> None:
+        operations = []
+        for key, data in items.items():
+            data["id"] = key
+            data["partitionKey"] = partition_key
+            operations.append(("upsert", (data,)))
+
+        # Transactional batches are limited in size, so split them if needed
+        container = self._get_container()
+        for start in range(0, len(operations), COSMOS_MAX_BATCH_OPERATIONS):
+            await container.execute_item_batch(
+                batch_operations=operations[start : start + COSMOS_MAX_BATCH_OPERATIONS],
+                partition_key=partition_key,
+            )
 
     async def delete_data(self, key: str, partition_key: str) -> None:
-        # Delete the discount from a hypothetical service using Dapr state
-        self.container.delete_item(item=key, partition_key=partition_key)
+        await self._get_container().delete_item(item=key, partition_key=partition_key)
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool):
+    """
+    Hold an advisory lock on the given file for the duration of the block.
+    Shared locks allow concurrent journal appends, exclusive locks are used for compaction.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class LocalPartition:
+    """
+    In-memory copy of a local partition, indexed by item id.
+    It is built from the snapshot file and the journal entries replayed on top of it.
+    The (mtime, size) stamp of the snapshot and the journal offset are kept to detect changes.
+    """
+
+    def __init__(self, items: list[dict], snapshot_stamp: tuple[int, int]):
+        self.snapshot_stamp = snapshot_stamp
+        self.journal_offset = 0
+        self.journal_entries = 0
+        self.index: dict[str, dict] = {}
+        # NOTE some partitions (e.g. order) contain items without an id
+        self.unkeyed: list = []
+        for item in items:
+            if isinstance(item, dict) and "id" in item:
+                # Keep the first match, as a linear scan would
+                self.index.setdefault(item["id"], item)
+            else:
+                self.unkeyed.append(item)
+
+    @property
+    def items(self) -> list[dict]:
+        return self.unkeyed + list(self.index.values())
+
+    def apply(self, entry: dict) -> None:
+        if entry["op"] == "upsert":
+            self.index[entry["id"]] = entry["data"]
+        elif entry["op"] == "delete":
+            self.index.pop(entry["id"], None)
+        self.journal_entries += 1
 
 
 class LocalDataStore(DataStore):
+    """
+    Data store backed by local JSON files, one per partition.
 
-    def __init__(self):
+    Each partition is made of a snapshot ({partition_key}.json) and an append-only
+    journal ({partition_key}.journal.jsonl). Writes only append to the journal, and
+    the journal is periodically compacted into a new snapshot with an atomic rename.
+    """
+
+    # Shared by all instances, so every plugin reuses the same parsed partitions
+    _partitions: dict[str, LocalPartition] = {}
+
+    def __init__(self, cache: bool | None = None):
         super().__init__()
         self.data_folder = config.LOCAL_DATA_FOLDER
+        self.cache = config.LOCAL_DATA_CACHE if cache is None else cache
+        self.compact_threshold = config.LOCAL_DATA_COMPACT_THRESHOLD
 
-    async def get_data(self, key: str, partition_key: str) -> dict:
-        # Read from local file using partition key as filename
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "r") as file:
-            data = file.read()
+    def _partition_path(self, partition_key: str) -> str:
+        return os.path.join(self.data_folder, f"{partition_key}.json")
 
-        # Assuming the data is in JSON format, parse it
-        data: list[dict] = json.loads(data)
+    def _journal_path(self, partition_key: str) -> str:
+        return os.path.join(self.data_folder, f"{partition_key}.journal.jsonl")
 
-        # Return the specific key's data, assuming "id" is the key in the JSON
-        for item in data:
-            if item["id"] == key:
-                return item
-        return None
+    def _lock_path(self, partition_key: str) -> str:
+        return os.path.join(self.data_folder, f"{partition_key}.lock")
 
-    async def query_data(self, query: object, partition_key: str) -> list[dict]:
-        # Read from local file using partition key as filename
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "r") as file:
-            data = file.read()
+    def _load_partition(self, partition_key: str) -> LocalPartition:
+        with file_lock(self._lock_path(partition_key), exclusive=False):
+            return self._read_partition(partition_key)
 
-        # Assuming the data is in JSON format, parse it
-        data: list[dict] = json.loads(data)
+    def _read_partition(self, partition_key: str) -> LocalPartition:
+        # NOTE caller must hold the partition lock
+        path = self._partition_path(partition_key)
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
 
-        # Run SQL query over JSON list?
+        partition = self._partitions.get(path) if self.cache else None
+        if partition is None or partition.snapshot_stamp != stamp:
+            # Read from local file using partition key as filename
+            with open(path, "r") as file:
+                data: list[dict] = json.loads(file.read())
+            partition = LocalPartition(data, stamp)
+            logger.debug(f"Loaded local partition {partition_key} ({len(data)} items)")
 
-        # Return the specific key's data, assuming "id" is the key in the JSON
-        return data
+        self._replay_journal(partition_key, partition)
 
-    async def save_data(self, key: str, partition_key: str, data: any) -> None:
-        # Read from local file using partition key as filename
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "r") as file:
-            existing_data = file.read()
+        if self.cache:
+            self._partitions[path] = partition
+        return partition
 
-        # Assuming the data is in JSON format, parse it
-        existing_data: list[dict] = json.loads(existing_data)
+    def _replay_journal(self, partition_key: str, partition: LocalPartition) -> None:
+        # Only the journal tail written since the last replay is read
+        journal_path = self._journal_path(partition_key)
+        try:
+            size = os.path.getsize(journal_path)
+        except FileNotFoundError:
+            return
+        if size <= partition.journal_offset:
+            return
+
+        with open(journal_path, "rb") as file:
+            file.seek(partition.journal_offset)
+            chunk = file.read()
+
+        # Only consume complete lines, a trailing partial line is a write in flight or a crash
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                partition.apply(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping corrupted journal entry in partition {partition_key}")
+        partition.journal_offset += end
+
+    def _append_journal(self, partition_key: str, entries: list[dict]) -> None:
+        lines = "".join(json.dumps(entry) + "\n" for entry in entries).encode()
+
+        with file_lock(self._lock_path(partition_key), exclusive=False):
+            # Append lines only, concurrent writers never rewrite each other's data
+            with open(self._journal_path(partition_key), "ab") as file:
+                file.write(lines)
+                file.flush()
+                os.fsync(file.fileno())
+
+            partition = self._read_partition(partition_key)
+
+        if partition.journal_entries >= self.compact_threshold:
+            self._compact_partition(partition_key)
+
+    def _compact_partition(self, partition_key: str) -> None:
+        with file_lock(self._lock_path(partition_key), exclusive=True):
+            partition = self._read_partition(partition_key)
+            if partition.journal_entries == 0:
+                # Already compacted by another writer
+                return
+
+            logger.info(
+                f"Compacting local partition {partition_key} ({partition.journal_entries} journal entries)"
+            )
+            items = partition.items
+            path = self._partition_path(partition_key)
+
+            # Write the new snapshot aside, then atomically swap it in
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as file:
+                file.write(json.dumps(items))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, path)
+
+            # NOTE if we crash before this, replaying the journal again is idempotent
+            os.remove(self._journal_path(partition_key))
+
+            if self.cache:
+                stat = os.stat(path)
+                self._partitions[path] = LocalPartition(
+                    items, (stat.st_mtime_ns, stat.st_size)
+                )
+
+    def partition_version(self, partition_key: str) -> object | None:
+        # Stat only, no need to read the files
+        snapshot = os.stat(self._partition_path(partition_key))
+        try:
+            journal_size = os.path.getsize(self._journal_path(partition_key))
+        except FileNotFoundError:
+            journal_size = 0
+        return (snapshot.st_mtime_ns, snapshot.st_size, journal_size)
 
-        # Append new data to the existing data
-        existing_data.append(data)
+    async def get_data(self, key: str, partition_key: str) -> dict:
+        item = self._load_partition(partition_key).index.get(key)
+        # NOTE return a copy, callers may add fields to the item
+        return dict(item) if item is not None else None
 
-        # Write back to the file
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "w") as file:
-            file.write(json.dumps(existing_data))
+    async def get_many(self, keys: list[str], partition_key: str) -> list[dict]:
+        index = self._load_partition(partition_key).index
+        return [dict(index[key]) if key in index else None for key in keys]
 
-    async def delete_data(self, key: str, partition_key: str) -> None:
-        # Read from local file using partition key as filename
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "r") as file:
-            existing_data = file.read()
+    async def query_data(self, query: str | Query, partition_key: str) -> list[dict]:
+        items = self._load_partition(partition_key).items
+        if isinstance(query, Query):
+            items = query.apply(items)
+        # NOTE raw SQL strings are not evaluated, all items are returned
 
-        # Assuming the data is in JSON format, parse it
-        existing_data: list[dict] = json.loads(existing_data)
+        # Return copies of the items, callers may add fields to them
+        return [dict(item) if isinstance(item, dict) else item for item in items]
 
-        # Remove the specific key's data
-        existing_data = [item for item in existing_data if item["id"] != key]
+    async def save_data(self, key: str, partition_key: str, data: any) -> None:
+        # Upsert by key, as the Cosmos and Dapr stores do
+        data = {**data, "id": key}
+        self._append_journal(partition_key, [{"op": "upsert", "id": key, "data": data}])
+
+    async def save_many(self, items: dict[str, dict], partition_key: str) -> None:
+        self._append_journal(
+            partition_key,
+            [
+                {"op": "upsert", "id": key, "data": {**data, "id": key}}
+                for key, data in items.items()
+            ],
+        )
 
-        # Write back to the file
-        with open(os.path.join(self.data_folder, f"{partition_key}.json"), "w") as file:
-            file.write(json.dumps(existing_data))
+    async def delete_data(self, key: str, partition_key: str) -> None:
+        self._append_journal(partition_key, [{"op": "delete", "id": key}])
 
 
 class DaprActorStore():
@@ -198,11 +508,201 @@ class DaprActorStore():
         return list(dict.fromkeys(actor_list))
 
 
+async def close_data_stores() -> None:
+    """Close the clients shared by the remote data stores."""
+    await CosmosDataStore.close()
+    await DaprDataStore.close()
+
+
+class CatalogSnapshot:
+    """A whole reference partition held in memory, indexed by item id."""
+
+    def __init__(self, items: list[dict], version: object | None):
+        self.items = items
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.index: dict[str, dict] = {}
+        for item in items:
+            if isinstance(item, dict) and "id" in item:
+                self.index.setdefault(item["id"], item)
+
+
+class CachedDataStore(DataStore):
+    """
+    Read-through cache in front of another data store, for the reference (catalog) partitions.
+
+    Queried partitions are kept whole as snapshots, as long as they fit in the size bound,
+    and queries are then evaluated in memory. Point reads of partitions without a snapshot
+    are kept in an LRU of the same bound. Entries are refreshed as soon as the partition
+    version changes, or after the TTL for stores that cannot report changes.
+    """
+
+    def __init__(
+        self,
+        inner: DataStore,
+        partitions: list[str] = CATALOG_PARTITIONS,
+        ttl: float = config.CATALOG_CACHE_TTL,
+        max_items: int = config.CATALOG_CACHE_MAX_ITEMS,
+    ):
+        super().__init__()
+        self.inner = inner
+        self.partitions = set(partitions)
+        self.ttl = ttl
+        self.max_items = max_items
+        self._snapshots: dict[str, CatalogSnapshot] = {}
+        # Partitions too large to snapshot, with the time they were found to be
+        self._oversized: dict[str, float] = {}
+        # (partition, key) -> (item, version, loaded_at), in LRU order
+        self._items: OrderedDict[tuple[str, str], tuple[dict | None, object, float]] = (
+            OrderedDict()
+        )
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _is_fresh(self, version: object | None, entry_version: object | None, loaded_at: float) -> bool:
+        if version is not None:
+            return version == entry_version
+        return time.monotonic() - loaded_at < self.ttl
+
+    def _fresh_snapshot(self, partition_key: str, version: object | None) -> CatalogSnapshot | None:
+        snapshot = self._snapshots.get(partition_key)
+        if snapshot is not None and self._is_fresh(version, snapshot.version, snapshot.loaded_at):
+            return snapshot
+        return None
+
+    async def _load_snapshot(self, partition_key: str) -> CatalogSnapshot | None:
+        version = self.inner.partition_version(partition_key)
+        snapshot = self._fresh_snapshot(partition_key, version)
+        if snapshot is not None:
+            catalog_cache_hits.add(1, {"partition": partition_key})
+            return snapshot
+
+        oversized_at = self._oversized.get(partition_key)
+        if oversized_at is not None and time.monotonic() - oversized_at < self.ttl:
+            return None
+
+        lock = self._locks.setdefault(partition_key, asyncio.Lock())
+        async with lock:
+            # Another task may have loaded the partition while we waited
+            snapshot = self._fresh_snapshot(partition_key, version)
+            if snapshot is not None:
+                catalog_cache_hits.add(1, {"partition": partition_key})
+                return snapshot
+
+            catalog_cache_misses.add(1, {"partition": partition_key})
+            items = await self.inner.query_data(Query(), partition_key)
+            if len(items) > self.max_items:
+                logger.info(
+                    f"Partition {partition_key} has {len(items)} items, too large to cache whole"
+                )
+                self._oversized[partition_key] = time.monotonic()
+                self._snapshots.pop(partition_key, None)
+                return None
+
+            snapshot = CatalogSnapshot(items, version)
+            self._snapshots[partition_key] = snapshot
+            self._oversized.pop(partition_key, None)
+            logger.debug(f"Cached partition {partition_key} ({len(items)} items)")
+            return snapshot
+
+    def _put_item(self, partition_key: str, key: str, item: dict | None, version: object | None) -> None:
+        self._items[(partition_key, key)] = (item, version, time.monotonic())
+        self._items.move_to_end((partition_key, key))
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def _invalidate(self, partition_key: str, keys: list[str]) -> None:
+        self._snapshots.pop(partition_key, None)
+        for key in keys:
+            self._items.pop((partition_key, key), None)
+
+    async def get_data(self, key: str, partition_key: str) -> dict:
+        if partition_key not in self.partitions:
+            return await self.inner.get_data(key, partition_key)
+        return (await self.get_many([key], partition_key))[0]
+
+    async def get_many(self, keys: list[str], partition_key: str) -> list[dict]:
+        if partition_key not in self.partitions:
+            return await self.inner.get_many(keys, partition_key)
+
+        version = self.inner.partition_version(partition_key)
+        attributes = {"partition": partition_key}
+
+        # NOTE point reads never trigger a whole partition load
+        snapshot = self._fresh_snapshot(partition_key, version)
+        if snapshot is not None:
+            catalog_cache_hits.add(len(keys), attributes)
+            return [_copy_item(snapshot.index.get(key)) for key in keys]
+
+        found: dict[str, dict | None] = {}
+        missing = []
+        for key in keys:
+            entry = self._items.get((partition_key, key))
+            if entry is not None and self._is_fresh(version, entry[1], entry[2]):
+                self._items.move_to_end((partition_key, key))
+                found[key] = entry[0]
+            else:
+                missing.append(key)
+
+        catalog_cache_hits.add(len(keys) - len(missing), attributes)
+        if missing:
+            catalog_cache_misses.add(len(missing), attributes)
+            loaded = await self.inner.get_many(missing, partition_key)
+            for key, item in zip(missing, loaded):
+                # NOTE missing items are cached as well, until they expire
+                self._put_item(partition_key, key, item, version)
+                found[key] = item
+
+        return [_copy_item(found[key]) for key in keys]
+
+    async def query_data(self, query: str | Query, partition_key: str) -> list[dict]:
+        # NOTE raw query strings cannot be evaluated in memory
+        if partition_key not in self.partitions or not isinstance(query, Query):
+            return await self.inner.query_data(query, partition_key)
+
+        snapshot = await self._load_snapshot(partition_key)
+        if snapshot is None:
+            return await self.inner.query_data(query, partition_key)
+
+        return [_copy_item(item) for item in query.apply(snapshot.items)]
+
+    async def save_data(self, key: str, partition_key: str, data: dict) -> None:
+        await self.inner.save_data(key, partition_key, data)
+        self._invalidate(partition_key, [key])
+
+    async def save_many(self, items: dict[str, dict], partition_key: str) -> None:
+        await self.inner.save_many(items, partition_key)
+        self._invalidate(partition_key, list(items))
+
+    async def delete_data(self, key: str, partition_key: str) -> None:
+        await self.inner.delete_data(key, partition_key)
+        self._invalidate(partition_key, [key])
+
+    def partition_version(self, partition_key: str) -> object | None:
+        return self.inner.partition_version(partition_key)
+
+
+def _copy_item(item: dict | None) -> dict | None:
+    # Callers may add fields to the items they get, keep the cached ones intact
+    return dict(item) if isinstance(item, dict) else item
+
+
+# Shared by all plugins, so they share clients and caches
+_data_store: DataStore | None = None
+
+
 def get_data_store() -> DataStore:
     # This function can be modified to return different data store implementations
     # based on the environment or configuration.
-    if config.COSMOSDB_ENDPOINT:
-        # return DaprDataStore()
-        return CosmosDataStore()
-    else:
-        return LocalDataStore()
+    global _data_store
+    if _data_store is None:
+        if config.COSMOSDB_ENDPOINT:
+            # data_store = DaprDataStore()
+            data_store = CosmosDataStore()
+        else:
+            data_store = LocalDataStore()
+
+        if config.CATALOG_CACHE_TTL > 0:
+            data_store = CachedDataStore(data_store)
+        _data_store = data_store
+
+    return _data_store
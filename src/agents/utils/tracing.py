@@ -99,6 +99,8 @@ def set_up_metrics():
             # Dropping all instrument names except for those starting with "semantic_kernel"
             View(instrument_name="*", aggregation=DropAggregation()),
             View(instrument_name="semantic_kernel*"),
+            # Keep the application metrics (caches, etc.)
+            View(instrument_name="agents*"),
         ],
     )
     # Sets the global default meter provider
@@ -8,7 +8,8 @@ from botbuilder.integration.aiohttp import ConfigurationBotFrameworkAuthenticati
 from botbuilder.schema import (
     Activity,
     ActivityTypes,
-    EndOfConversationCodes
+    EndOfConversationCodes,
+    Entity
 )
 from dapr.actor import ActorProxy, ActorId, ActorInterface, actormethod
 from semantic_kernel.contents import ChatMessageContent
@@ -79,6 +80,9 @@ class UserActorInterface(ActorInterface):
     @actormethod(name="ask")
     async def ask(self, input_message: str) -> list[dict]: ...
 
+    @actormethod(name="ask_stream")
+    async def ask_stream(self, request: dict) -> list[dict]: ...
+
     @actormethod(name="get_history")
     async def get_history(self) -> dict: ...
 
@@ -92,13 +96,40 @@ class UserActorInterface(ActorInterface):
     async def notify(self, message: str | dict) -> None: ...
 
 
+class StreamInfo(Entity):
+    """Teams streaming entity, ending the stream the actor started when sent with the final message."""
+
+    _attribute_map = {
+        "type": {"key": "type", "type": "str"},
+        "stream_id": {"key": "streamId", "type": "str"},
+        "stream_type": {"key": "streamType", "type": "str"},
+    }
+
+    def __init__(self, *, stream_id: str = None, stream_type: str = "final", **kwargs) -> None:
+        super(StreamInfo, self).__init__(type="streaminfo", **kwargs)
+        self.stream_id = stream_id
+        self.stream_type = stream_type
+
+
 @bot.activity(ActivityTypes.message)
 async def on_message(context: TurnContext, state: TurnState):
     user_message = context.activity.text
     logger.info("Received message from user: %s", user_message)
 
     proxy = create_user_actor_proxy(context)
-    response = await proxy.ask(user_message)
+    conversation = context.activity.conversation
+    if (
+        config.STREAM_RESPONSES
+        and context.activity.channel_id == "msteams"
+        # NOTE Teams only supports streaming in personal chats
+        and conversation.conversation_type == "personal"
+    ):
+        # The actor streams the answers to this conversation as they are generated,
+        # the messages sent below end the streams
+        response = await proxy.ask_stream({"message": user_message, "conversation_id": conversation.id})
+    else:
+        # NOTE in the context of a Copilot Skill, the whole response is returned at once
+        response = await proxy.ask(user_message)
     logger.info("Received response from actor: %s", response)
 
     # Send the response back to the user
@@ -111,6 +142,9 @@ async def on_message(context: TurnContext, state: TurnState):
         logger.info("Sending message: %s", chat_message.content)
         # Use the new function to create an adaptive card that handles tables
         card_activity = create_adaptive_card_from_content(chat_message)
+        stream_id = chat_message.metadata.get("stream_id")
+        if stream_id is not None:
+            card_activity.entities = [*(card_activity.entities or []), StreamInfo(stream_id=stream_id)]
         await context.send_activity(card_activity)
 
     if context.activity.channel_id != "msteams":
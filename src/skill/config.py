@@ -28,6 +28,9 @@ class Config:
 
     DATA_STORE_NAME = os.getenv("DATA_STORE_NAME", "data")
 
+    # Stream the answers to Teams conversations as they are generated
+    STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+
     def validate(self):
         if not self.HOST or not self.PORT:
             raise Exception(
@@ -0,0 +1,51 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from sk_ext.history_reducer import TokenBudgetHistoryReducer, reduce_messages
+
+
+def conversation(turns: int) -> list[ChatMessageContent]:
+    messages = []
+    for turn in range(turns):
+        messages.append(ChatMessageContent(role=AuthorRole.USER, content=f"user turn {turn}"))
+        messages.append(
+            ChatMessageContent(
+                role=AuthorRole.ASSISTANT,
+                name="PricingAgent",
+                items=[FunctionCallContent(id=f"call_{turn}", name="pricing-check_discount", arguments="{}")],
+            )
+        )
+        messages.append(ChatMessageContent(role=AuthorRole.ASSISTANT, name="PricingAgent", content=f"answer {turn}"))
+    return messages
+
+
+def reduced_contents(reducer: TokenBudgetHistoryReducer, messages: list[ChatMessageContent]) -> list[str]:
+    return [message.content for message in asyncio.run(reduce_messages(reducer, messages))]
+
+
+def test_first_user_message_is_pinned_by_default():
+    reducer = TokenBudgetHistoryReducer(target_count=3)
+
+    assert reduced_contents(reducer, conversation(6)) == ["user turn 0", "user turn 5", "answer 5"]
+
+
+def test_last_messages_without_pinning():
+    # As for the speaker election, which needs the last speakers
+    reducer = TokenBudgetHistoryReducer(target_count=3, pin_first_user_message=False)
+
+    assert reduced_contents(reducer, conversation(6)) == ["answer 4", "user turn 5", "answer 5"]
+
+
+def test_history_within_budget_is_kept():
+    reducer = TokenBudgetHistoryReducer(target_count=100)
+    messages = conversation(2)
+
+    assert asyncio.run(reduce_messages(reducer, messages)) is messages
+
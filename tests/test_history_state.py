@@ -0,0 +1,379 @@
+import asyncio
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from semantic_kernel.contents import ChatHistory, ChatMessageContent
+from semantic_kernel.contents.function_call_content import FunctionCallContent
+from semantic_kernel.contents.function_result_content import FunctionResultContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from actors.history_state import (
+    HEAD_STATE,
+    HISTORY_NOTE_NAME,
+    LEGACY_STATE,
+    HistoryState,
+    active_history_state,
+)
+from order.plugins.history_plugin import HistoryPlugin
+
+
+class MemoryStateManager:
+    """In-memory stand-in for the Dapr ActorStateManager: changes are kept until save_state."""
+
+    def __init__(self):
+        self.stored: dict = {}
+        self.pending: dict = {}
+        self.written: list[str] = []
+
+    async def try_get_state(self, name: str):
+        value = self.pending[name] if name in self.pending else self.stored.get(name)
+        return value is not None, value
+
+    async def set_state(self, name: str, value) -> None:
+        self.pending[name] = value
+
+    async def try_add_state(self, name: str, value) -> bool:
+        if (await self.try_get_state(name))[0]:
+            return False
+        self.pending[name] = value
+        return True
+
+    async def try_remove_state(self, name: str) -> bool:
+        exists = (await self.try_get_state(name))[0]
+        self.pending[name] = None
+        return exists
+
+    async def save_state(self) -> None:
+        for name, value in self.pending.items():
+            if value is None:
+                self.stored.pop(name, None)
+            else:
+                self.stored[name] = value
+                self.written.append(name)
+        self.pending = {}
+
+
+def user(text: str) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole.USER, content=text)
+
+
+def answer(text: str) -> ChatMessageContent:
+    return ChatMessageContent(role=AuthorRole.ASSISTANT, name="PricingAgent", content=text)
+
+
+def tool_call(call_id: str) -> ChatMessageContent:
+    return ChatMessageContent(
+        role=AuthorRole.ASSISTANT,
+        name="PricingAgent",
+        items=[FunctionCallContent(id=call_id, name="pricing-check_discount", arguments="{}")],
+    )
+
+
+def tool_result(call_id: str) -> ChatMessageContent:
+    return ChatMessageContent(
+        role=AuthorRole.TOOL,
+        items=[FunctionResultContent(id=call_id, name="pricing-check_discount", result=f"result {call_id}")],
+    )
+
+
+def texts(history: ChatHistory) -> list[str]:
+    return [
+        message.content or ",".join(item.id for item in message.items)
+        for message in history.messages
+    ]
+
+
+def conversation(count: int) -> ChatHistory:
+    return ChatHistory(messages=[(user if index % 2 == 0 else answer)(f"m{index}") for index in range(count)])
+
+
+def save(state_manager: MemoryStateManager, history: ChatHistory, segment_size: int) -> HistoryState:
+    state = HistoryState(state_manager, segment_size)
+    asyncio.run(state.save(history))
+    return state
+
+
+def test_round_trip():
+    state_manager = MemoryStateManager()
+    history = conversation(7)
+    save(state_manager, history, segment_size=3)
+
+    assert state_manager.stored[HEAD_STATE] == {
+        "segment_size": 3,
+        "segments": 3,
+        "count": 7,
+        "system_message": None,
+        "summary": None,
+        "payloads": {},
+    }
+    loaded = asyncio.run(HistoryState(state_manager, 3).load())
+    assert texts(loaded) == texts(history)
+    assert texts(asyncio.run(HistoryState(state_manager, 3).read())) == texts(history)
+
+
+def test_append_rewrites_only_the_last_segment():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(7), segment_size=3)
+    state = HistoryState(state_manager, 3)
+    history = asyncio.run(state.load())
+    state_manager.written = []
+
+    history.add_message(answer("m7"))
+    asyncio.run(state.save(history))
+
+    # The partial last segment is written again with the new message
+    assert state_manager.written == ["history_2", HEAD_STATE]
+    assert texts(ChatHistory.model_validate({"messages": state_manager.stored["history_2"]})) == ["m6", "m7"]
+
+
+def test_segment_size_of_stored_history_is_kept():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(5), segment_size=2)
+
+    state = HistoryState(state_manager, 10)
+    history = asyncio.run(state.load())
+    history.add_message(user("m5"))
+    asyncio.run(state.save(history))
+
+    assert state_manager.stored[HEAD_STATE]["segment_size"] == 2
+    assert texts(asyncio.run(state.read())) == texts(conversation(6))
+
+
+def test_windowed_load_then_append():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(10), segment_size=2)
+
+    state = HistoryState(state_manager, 2)
+    history = asyncio.run(state.load(window=2))
+
+    # The first message, the note for the 5 messages left out, then the last 2 segments
+    assert state.is_windowed
+    assert texts(history)[0] == "m0"
+    assert history.messages[1].role == AuthorRole.SYSTEM
+    assert history.messages[1].name == HISTORY_NOTE_NAME
+    assert texts(history)[2:] == ["m6", "m7", "m8", "m9"]
+
+    history.add_message(user("m10"))
+    history.add_message(answer("m11"))
+    asyncio.run(state.save(history))
+
+    # The messages are appended after the stored ones, and the note is not stored
+    assert state_manager.stored[HEAD_STATE]["count"] == 12
+    assert texts(asyncio.run(state.read())) == texts(conversation(12))
+
+
+def test_window_covering_all_but_the_first_segment_loads_everything():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(6), segment_size=2)
+
+    state = HistoryState(state_manager, 2)
+    history = asyncio.run(state.load(window=2))
+
+    # Skipping only segment 1 would save nothing, as segment 0 is read for the first message
+    assert not state.is_windowed
+    assert texts(history) == texts(conversation(6))
+
+
+def test_legacy_history_is_migrated():
+    state_manager = MemoryStateManager()
+    state_manager.stored[LEGACY_STATE] = conversation(3).model_dump()
+
+    state = HistoryState(state_manager, 2)
+    history = asyncio.run(state.load())
+    assert texts(history) == ["m0", "m1", "m2"]
+
+    history.add_message(answer("m3"))
+    asyncio.run(state.save(history))
+
+    assert LEGACY_STATE not in state_manager.stored
+    assert state_manager.stored[HEAD_STATE]["segments"] == 2
+    assert texts(asyncio.run(HistoryState(state_manager, 2).load())) == texts(conversation(4))
+
+
+def test_replaced_windowed_history_becomes_the_whole_history():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(10), segment_size=2)
+    state = HistoryState(state_manager, 2)
+    history = asyncio.run(state.load(window=2))
+
+    history.messages = [user("new m0"), answer("new m1"), user("new m2")]
+    asyncio.run(state.save(history))
+
+    assert state_manager.stored[HEAD_STATE]["count"] == 3
+    assert not any(name in state_manager.stored for name in ("history_2", "history_3", "history_4"))
+    assert texts(asyncio.run(state.read())) == ["new m0", "new m1", "new m2"]
+
+
+def test_window_is_extended_back_past_leading_tool_results():
+    state_manager = MemoryStateManager()
+    # Segments of 2: [m0, m1], [m2, m3], [m4, call], [result, result], [m8, m9]
+    history = conversation(5)
+    history.messages += [tool_call("call_1"), tool_result("call_1"), tool_result("call_1"), answer("m8"), user("m9")]
+    save(state_manager, history, segment_size=2)
+
+    state = HistoryState(state_manager, 2)
+    loaded = asyncio.run(state.load(window=2))
+
+    # The window would start with segment 3, whose tool results would miss their call
+    assert texts(loaded) == [
+        "m0",
+        "3 earlier messages of this conversation are not shown.",
+        "m4",
+        "call_1",
+        "call_1",
+        "call_1",
+        "m8",
+        "m9",
+    ]
+    assert loaded.messages[1].name == HISTORY_NOTE_NAME
+
+    loaded.add_message(answer("m10"))
+    asyncio.run(state.save(loaded))
+    assert texts(asyncio.run(state.read())) == texts(history) + ["m10"]
+
+
+class RecordingSummarizer:
+    """Summarizer listing the messages it summarized, after the previous summary."""
+
+    def __init__(self):
+        self.calls: list[tuple[str, list[str]]] = []
+
+    async def __call__(self, summary: str, messages: list[ChatMessageContent]) -> str:
+        contents = [message.content for message in messages]
+        self.calls.append((summary, contents))
+        return " ".join(([summary] if summary else []) + contents)
+
+
+def test_messages_before_the_window_are_summarized():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(10), segment_size=2)
+    summarizer = RecordingSummarizer()
+
+    state = HistoryState(state_manager, 2, summarizer=summarizer)
+    history = asyncio.run(state.load(window=2))
+
+    assert summarizer.calls == [("", ["m1", "m2", "m3", "m4", "m5"])]
+    assert history.messages[1].content == (
+        "5 earlier messages of this conversation are not shown, they are summarized as follows.\n"
+        "m1 m2 m3 m4 m5"
+    )
+
+    # The summary is stored with the head, and only extended with the messages leaving the window
+    history.add_message(user("m10"))
+    history.add_message(answer("m11"))
+    asyncio.run(state.save(history))
+    assert state_manager.stored[HEAD_STATE]["summary"] == {"count": 6, "text": "m1 m2 m3 m4 m5"}
+
+    state = HistoryState(state_manager, 2, summarizer=summarizer)
+    history = asyncio.run(state.load(window=2))
+    assert summarizer.calls[1:] == [("m1 m2 m3 m4 m5", ["m6", "m7"])]
+    assert texts(history)[2:] == ["m8", "m9", "m10", "m11"]
+
+
+def test_stored_summary_is_reused_without_summarizer_call():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(10), segment_size=2)
+    summarizer = RecordingSummarizer()
+    state = HistoryState(state_manager, 2, summarizer=summarizer)
+    history = asyncio.run(state.load(window=2))
+    history.add_message(user("m10"))
+    asyncio.run(state.save(history))
+
+    history = asyncio.run(HistoryState(state_manager, 2, summarizer=summarizer).load(window=3))
+
+    assert len(summarizer.calls) == 1
+    assert history.messages[1].content.endswith("\nm1 m2 m3 m4 m5")
+
+
+def test_count_is_noted_when_the_summary_fails():
+    state_manager = MemoryStateManager()
+    save(state_manager, conversation(10), segment_size=2)
+
+    async def failing_summarizer(summary, messages):
+        raise RuntimeError("model unavailable")
+
+    state = HistoryState(state_manager, 2, summarizer=failing_summarizer)
+    history = asyncio.run(state.load(window=2))
+
+    assert history.messages[1].content == "5 earlier messages of this conversation are not shown."
+    history.add_message(user("m10"))
+    asyncio.run(state.save(history))
+    assert state_manager.stored[HEAD_STATE]["summary"] is None
+
+
+CATALOG = "SKU-1 screws, " * 300
+
+
+def catalog_result(call_id: str) -> ChatMessageContent:
+    return ChatMessageContent(
+        role=AuthorRole.TOOL,
+        items=[FunctionResultContent(id=call_id, name="inventory-list_skus", result=CATALOG)],
+    )
+
+
+def payloads(state_manager: MemoryStateManager) -> list[str]:
+    return [name for name in state_manager.stored if name.startswith("payload_")]
+
+
+def test_large_tool_results_are_stored_out_of_the_history():
+    state_manager = MemoryStateManager()
+    state = HistoryState(state_manager, 2)
+    history = ChatHistory(messages=[user("m0"), tool_call("c1"), catalog_result("c1"), answer("m3")])
+    asyncio.run(state.save(history))
+    state_manager.written = []
+
+    assert asyncio.run(state.compact_tool_results(history, 0, max_length=1000)) == 1
+    asyncio.run(state.save(history))
+
+    # The segment holding the result is written again, with the payload once
+    (payload,) = payloads(state_manager)
+    assert sorted(state_manager.written) == sorted(["history_1", payload, HEAD_STATE])
+    assert state_manager.stored[payload] == CATALOG
+    assert state_manager.stored[HEAD_STATE]["payloads"] == {"1": [payload[len("payload_") :]]}
+    result = history.messages[2].items[0].result
+    assert len(result) < 1000 and f"payload:{payload[len('payload_') :]}" in result
+
+    # The agents get the reference, while the history read is whole
+    loaded = asyncio.run(HistoryState(state_manager, 2).load())
+    assert loaded.messages[2].items[0].result == result
+    assert asyncio.run(state.read()).messages[2].items[0].result == CATALOG
+    assert asyncio.run(state.get_payload(result)) == CATALOG
+
+
+def test_compacted_results_are_fetched_by_the_agents():
+    state_manager = MemoryStateManager()
+    state = HistoryState(state_manager, 2)
+    history = ChatHistory(messages=[user("m0"), tool_call("c1"), catalog_result("c1")])
+    asyncio.run(state.compact_tool_results(history, 0, max_length=1000))
+    asyncio.run(state.save(history))
+    reference = history.messages[2].items[0].metadata["payload"]
+
+    async def fetch(reference: str) -> str:
+        active_history_state.set(state)
+        return await HistoryPlugin().get_tool_result(f"payload:{reference}")
+
+    assert asyncio.run(fetch(reference)) == CATALOG
+    assert asyncio.run(fetch("0" * 32)).startswith("No tool result")
+
+
+def test_payloads_are_removed_with_their_last_reference():
+    state_manager = MemoryStateManager()
+    state = HistoryState(state_manager, 2)
+    history = ChatHistory(
+        messages=[user("m0"), tool_call("c1"), catalog_result("c1"), tool_call("c2"), catalog_result("c2")]
+    )
+    asyncio.run(state.compact_tool_results(history, 0, max_length=1000))
+    asyncio.run(state.save(history))
+    # Identical results share their payload
+    assert len(payloads(state_manager)) == 1
+
+    del history.messages[3:]
+    asyncio.run(state.save(history))
+    assert len(payloads(state_manager)) == 1
+
+    history.messages[1:] = [answer("m1")]
+    asyncio.run(state.save(history))
+    assert payloads(state_manager) == []
+    assert state_manager.stored[HEAD_STATE]["payloads"] == {}
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+import pytest
+
+from utils.config import config
+from utils.store import LocalDataStore
+
+SAMPLE_STORE = os.path.join(os.path.dirname(__file__), "data/store")
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # Work on a copy of the sample data, the store writes next to the snapshots
+    data_folder = tmp_path / "store"
+    shutil.copytree(SAMPLE_STORE, data_folder)
+    monkeypatch.setattr(config, "LOCAL_DATA_FOLDER", str(data_folder))
+    return LocalDataStore()
+
+
+def test_save_upserts_instead_of_appending(store):
+    sku = asyncio.run(store.get_data("SKU-A100", "sku"))
+    count = len(asyncio.run(store.query_data("SELECT * FROM c", "sku")))
+
+    asyncio.run(store.save_data("SKU-A100", "sku", {**sku, "inventory": 7}))
+
+    items = asyncio.run(store.query_data("SELECT * FROM c", "sku"))
+    assert len(items) == count
+    assert [item["inventory"] for item in items if item["id"] == "SKU-A100"] == [7]
+    assert asyncio.run(store.get_data("SKU-A100", "sku"))["inventory"] == 7
+
+
+def test_save_adds_new_items(store):
+    asyncio.run(store.save_data("SKU-Z999", "sku", {"description": "Scarf", "inventory": 3}))
+
+    assert asyncio.run(store.get_data("SKU-Z999", "sku")) == {
+        "description": "Scarf",
+        "inventory": 3,
+        "id": "SKU-Z999",
+    }
+
+
+def test_delete_removes_item(store):
+    asyncio.run(store.delete_data("SKU-A100", "sku"))
+
+    assert asyncio.run(store.get_data("SKU-A100", "sku")) is None
+
+
+def test_compaction_keeps_latest_record(store):
+    store.compact_threshold = 3
+    for inventory in range(3):
+        asyncio.run(store.save_data("SKU-A100", "sku", {"inventory": inventory}))
+
+    # The journal was folded into the snapshot
+    assert not os.path.exists(store._journal_path("sku"))
+    with open(store._partition_path("sku")) as file:
+        snapshot = json.load(file)
+    assert [item for item in snapshot if item["id"] == "SKU-A100"] == [
+        {"inventory": 2, "id": "SKU-A100"}
+    ]
+
+    # Another process, without the cached partition, reads the same
+    uncached = LocalDataStore(cache=False)
+    assert asyncio.run(uncached.get_data("SKU-A100", "sku")) == {"inventory": 2, "id": "SKU-A100"}
+
+
+def test_journal_is_read_by_other_stores(store):
+    other = LocalDataStore()
+    asyncio.run(other.get_data("SKU-A100", "sku"))
+
+    asyncio.run(store.save_data("SKU-A100", "sku", {"inventory": 1}))
+
+    assert asyncio.run(other.get_data("SKU-A100", "sku")) == {"inventory": 1, "id": "SKU-A100"}
+
+
+def test_get_many_keeps_key_order(store):
+    items = asyncio.run(store.get_many(["SKU-A103", "SKU-MISSING", "SKU-A100"], "sku"))
+
+    assert [item["id"] if item else None for item in items] == ["SKU-A103", None, "SKU-A100"]
+
+
+def test_save_many_upserts_all_items(store):
+    asyncio.run(
+        store.save_many({"SKU-A100": {"inventory": 1}, "SKU-Z999": {"inventory": 2}}, "sku")
+    )
+
+    items = asyncio.run(store.get_many(["SKU-A100", "SKU-Z999"], "sku"))
+    assert items == [{"inventory": 1, "id": "SKU-A100"}, {"inventory": 2, "id": "SKU-Z999"}]
+
+
+def test_returned_items_are_copies(store):
+    item = asyncio.run(store.get_data("SKU-A100", "sku"))
+    item["inventory"] = -1
+
+    assert asyncio.run(store.get_data("SKU-A100", "sku"))["inventory"] != -1
+
+
+def test_partition_version_changes_on_write(store):
+    version = store.partition_version("sku")
+    assert store.partition_version("sku") == version
+
+    asyncio.run(store.save_data("SKU-A100", "sku", {"inventory": 1}))
+    written = store.partition_version("sku")
+    assert written != version
+
+    store.compact_threshold = 1
+    asyncio.run(store.delete_data("SKU-A100", "sku"))
+    assert store.partition_version("sku") not in (version, written)
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from order.order_plan import order_plan_fingerprint
+from sk_ext.planning_strategy import (
+    CachedPlanningStrategy,
+    PlanningStrategy,
+    TeamPlan,
+    TeamPlanStep,
+    _plan_template,
+)
+
+AGENTS = [
+    ChatCompletionAgent(id="validator_agent", name="ValidatorAgent", instructions="Validate orders"),
+    ChatCompletionAgent(id="pricing_agent", name="PricingAgent", instructions="Price orders"),
+]
+
+
+class OrderPlanner(PlanningStrategy):
+    """Planner writing the ids of the order it plans in the instructions, as the planner model does."""
+
+    calls: int = 0
+
+    async def create_plan(self, agents, history, feedback=""):
+        self.calls += 1
+        order = json.loads(history[-1].content.split("\n\n", 1)[1])
+        skus = ", ".join(line["sku"] for line in order["input"]["order"])
+        return TeamPlan(
+            plan=[
+                TeamPlanStep(
+                    agent_id="validator_agent",
+                    instructions=f"Validate order {order['order_id']} of {order['input']['customerId']}: {skus}.",
+                    depends_on=[],
+                ),
+                TeamPlanStep(
+                    agent_id="pricing_agent",
+                    instructions=f"Price {skus} for {order['input']['customerId']} as {{\"lines\": [...]}}.",
+                    depends_on=[0],
+                ),
+            ]
+        )
+
+
+def order_inquiry(order_id: str, customer_id: str, skus: list[str], quantity: int = 5) -> str:
+    data = {
+        "order_id": order_id,
+        "input": {
+            "customerId": customer_id,
+            "order": [{"sku": sku, "quantity": quantity, "unit_price": 10.0} for sku in skus],
+        },
+    }
+    return f"Process order {order_id} with data\n\n{json.dumps(data)}"
+
+
+def create_plan(strategy: CachedPlanningStrategy, inquiry: str, feedback: str = "") -> TeamPlan:
+    history = [ChatMessageContent(role=AuthorRole.USER, content=inquiry)]
+    return asyncio.run(strategy.create_plan(AGENTS, history, feedback))
+
+
+def test_cached_plan_is_instantiated_for_another_order():
+    planner = OrderPlanner()
+    strategy = CachedPlanningStrategy(inner=planner, fingerprint=order_plan_fingerprint)
+
+    create_plan(strategy, order_inquiry("ord-1001", "cust001", ["SKU-A100", "SKU-A102"]))
+    plan = create_plan(strategy, order_inquiry("ord-2002", "cust002", ["SKU-B200", "SKU-A10"]))
+
+    assert planner.calls == 1
+    assert [step.instructions for step in plan.plan] == [
+        "Validate order ord-2002 of cust002: SKU-B200, SKU-A10.",
+        'Price SKU-B200, SKU-A10 for cust002 as {"lines": [...]}.',
+    ]
+    assert [step.depends_on for step in plan.plan] == [[], [0]]
+    # None of the ids of the first order leak through
+    instructions = " ".join(step.instructions for step in plan.plan)
+    for value in ("ord-1001", "cust001", "SKU-A100", "SKU-A102"):
+        assert value not in instructions
+
+
+def test_orders_of_other_quantities_do_not_share_plans():
+    planner = OrderPlanner()
+    strategy = CachedPlanningStrategy(inner=planner, fingerprint=order_plan_fingerprint)
+
+    create_plan(strategy, order_inquiry("ord-1001", "cust001", ["SKU-A100"], quantity=5))
+    create_plan(strategy, order_inquiry("ord-2002", "cust002", ["SKU-B200"], quantity=50))
+
+    assert planner.calls == 2
+
+
+def test_feedback_plans_are_not_cached():
+    planner = OrderPlanner()
+    strategy = CachedPlanningStrategy(inner=planner, fingerprint=order_plan_fingerprint)
+
+    create_plan(strategy, order_inquiry("ord-1001", "cust001", ["SKU-A100"]))
+    create_plan(strategy, order_inquiry("ord-1001", "cust001", ["SKU-A100"]), feedback="SKU-A100 is short")
+    create_plan(strategy, order_inquiry("ord-2002", "cust002", ["SKU-B200"]))
+
+    # The cached plan was evicted by the feedback, and the feedback plan not cached
+    assert planner.calls == 3
+
+
+def test_template_replaces_whole_id_tokens_only():
+    plan = TeamPlan(
+        plan=[TeamPlanStep(agent_id="pricing_agent", instructions="Price SKU-A100 and SKU-A10, not {total}.")]
+    )
+
+    template = _plan_template(plan, {"sku_0": "SKU-A10", "sku_1": "SKU-A100"})
+
+    assert template.plan[0].instructions == "Price {sku_1} and {sku_0}, not {{total}}."
+    assert template.plan[0].instructions.format_map({"sku_0": "X-1", "sku_1": "X-2"}) == (
+        "Price X-2 and X-1, not {total}."
+    )
+
+
+def test_plans_with_untemplatable_values_are_not_cached():
+    def template(instructions: str, values: dict) -> TeamPlan | None:
+        return _plan_template(
+            TeamPlan(plan=[TeamPlanStep(agent_id="pricing_agent", instructions=instructions)]), values
+        )
+
+    # A numeric id cannot be told apart from the quantities
+    assert template("Process order 1001 of 4 lines", {"order_id": "1001"}) is None
+    # The same text for two values
+    assert template("Price SKU-A100", {"sku_0": "SKU-A100", "sku_1": "SKU-A100"}) is None
+    # An occurrence that is not a whole token would keep the id of the original order
+    assert template("Ship SKU-A100x2", {"sku_0": "SKU-A100"}) is None
+    # Numeric ids not mentioned do not matter
+    assert template("Price SKU-A100", {"order_id": "1001", "sku_0": "SKU-A100"}) is not None
@@ -0,0 +1,85 @@
+import asyncio
+import os
+import sys
+from collections.abc import AsyncIterable
+from typing import Any
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from semantic_kernel import Kernel
+from semantic_kernel.agents import Agent
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from order.order_plan import ORDER_PLAN
+from sk_ext.feedback_strategy import DefaultFeedbackStrategy
+from sk_ext.planned_team import PlannedTeam
+from sk_ext.planning_strategy import PlanningStrategy, TeamPlan, TeamPlanStep
+
+
+class RecordingAgent(Agent):
+    """Agent answering with its name, recording when it starts and ends in the shared events."""
+
+    # Shared by the agents of a team, so it is not copied on validation
+    events: Any
+
+    async def get_response(self, history, **kwargs) -> ChatMessageContent:
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, name=self.name, content=self.name)
+
+    async def invoke(self, history, **kwargs) -> AsyncIterable[ChatMessageContent]:
+        self.events.append(("start", self.id))
+        # Let the other ready steps start meanwhile
+        for _ in range(3):
+            await asyncio.sleep(0)
+        self.events.append(("end", self.id))
+        yield ChatMessageContent(role=AuthorRole.ASSISTANT, name=self.name, content=self.name)
+
+    async def invoke_stream(self, history, **kwargs):
+        yield await self.get_response(history)
+
+
+def run_plan(plan: TeamPlan) -> list[tuple[str, str]]:
+    events = []
+    agent_ids = dict.fromkeys(step.agent_id for step in plan.plan)
+    team = PlannedTeam(
+        id="team",
+        name="team",
+        description="Test team",
+        agents=[RecordingAgent(id=agent_id, name=agent_id, events=events) for agent_id in agent_ids],
+        planning_strategy=PlanningStrategy(),
+        feedback_strategy=DefaultFeedbackStrategy(kernel=Kernel()),
+    )
+    history = [ChatMessageContent(role=AuthorRole.USER, content="Process order")]
+
+    async def schedule():
+        tasks, _ = team._schedule_plan(plan, history, asyncio.Event())
+        await asyncio.gather(*tasks)
+
+    asyncio.run(schedule())
+    return events
+
+
+def test_order_plan_starts_independent_steps_concurrently():
+    events = run_plan(ORDER_PLAN)
+
+    # Validation and substitution both start before either ends
+    assert events[:2] == [("start", "validator_agent"), ("start", "substitution_agent")]
+    # Pricing waits for the substitutions, fulfillment for all the other steps
+    assert events.index(("start", "pricing_agent")) > events.index(("end", "substitution_agent"))
+    assert events[-2:] == [("start", "fulfillment_agent"), ("end", "fulfillment_agent")]
+
+
+def test_steps_without_dependencies_run_sequentially():
+    plan = TeamPlan(
+        plan=[
+            TeamPlanStep(agent_id="first_agent", instructions="First"),
+            TeamPlanStep(agent_id="second_agent", instructions="Second"),
+        ]
+    )
+
+    assert run_plan(plan) == [
+        ("start", "first_agent"),
+        ("end", "first_agent"),
+        ("start", "second_agent"),
+        ("end", "second_agent"),
+    ]
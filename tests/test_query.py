@@ -0,0 +1,129 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+import pytest
+
+from utils.query import Query
+
+ITEMS = [
+    {"id": "SKU-A100", "inventory": 100, "pricesheet": {"updated": "2025-01-10"}, "lines": [{"sku": "A"}]},
+    {"id": "SKU-A102", "inventory": 0, "pricesheet": {"updated": "2025-03-01"}, "lines": [{"sku": "B"}, {"sku": "C"}]},
+    {"id": "SKU-A103", "inventory": 50, "lines": []},
+    {"id": "SKU-B200", "inventory": 20, "pricesheet": {"updated": "2024-12-31"}},
+]
+
+# Query, Cosmos SQL text and parameters, ids of the matching items in order
+CASES = [
+    pytest.param(Query(), "SELECT * FROM c", [], ["SKU-A100", "SKU-A102", "SKU-A103", "SKU-B200"], id="all"),
+    pytest.param(
+        Query().where("id", "=", "SKU-A102"),
+        "SELECT * FROM c WHERE c.id = @p0",
+        [{"name": "@p0", "value": "SKU-A102"}],
+        ["SKU-A102"],
+        id="where-equal",
+    ),
+    pytest.param(
+        Query().where("inventory", ">=", 50),
+        "SELECT * FROM c WHERE c.inventory >= @p0",
+        [{"name": "@p0", "value": 50}],
+        ["SKU-A100", "SKU-A103"],
+        id="where-compare",
+    ),
+    pytest.param(
+        Query().where("pricesheet.updated", ">", "2025-01-01"),
+        "SELECT * FROM c WHERE c.pricesheet.updated > @p0",
+        [{"name": "@p0", "value": "2025-01-01"}],
+        ["SKU-A100", "SKU-A102"],
+        id="where-nested-field",
+    ),
+    pytest.param(
+        Query().where_in("id", ["SKU-B200", "SKU-A100", "SKU-MISSING"]),
+        "SELECT * FROM c WHERE ARRAY_CONTAINS(@p0, c.id)",
+        [{"name": "@p0", "value": ["SKU-B200", "SKU-A100", "SKU-MISSING"]}],
+        ["SKU-A100", "SKU-B200"],
+        id="where-in",
+    ),
+    pytest.param(
+        Query().where_any_in("lines", "sku", ["C", "D"]),
+        "SELECT * FROM c WHERE EXISTS(SELECT VALUE x FROM x IN c.lines WHERE ARRAY_CONTAINS(@p0, x.sku))",
+        [{"name": "@p0", "value": ["C", "D"]}],
+        ["SKU-A102"],
+        id="where-any-in",
+    ),
+    pytest.param(
+        Query().order_by("inventory"),
+        "SELECT * FROM c ORDER BY c.inventory ASC",
+        [],
+        ["SKU-A102", "SKU-B200", "SKU-A103", "SKU-A100"],
+        id="order-by",
+    ),
+    pytest.param(
+        Query().order_by("pricesheet.updated", descending=True),
+        "SELECT * FROM c ORDER BY c.pricesheet.updated DESC",
+        [],
+        ["SKU-A103", "SKU-A102", "SKU-A100", "SKU-B200"],
+        id="order-by-descending-missing-first",
+    ),
+    pytest.param(
+        Query().limit(2),
+        "SELECT TOP @p0 * FROM c",
+        [{"name": "@p0", "value": 2}],
+        ["SKU-A100", "SKU-A102"],
+        id="limit",
+    ),
+    pytest.param(
+        Query()
+        .where("inventory", ">", 0)
+        .where_in("id", ["SKU-A100", "SKU-A103", "SKU-B200"])
+        .order_by("id", descending=True)
+        .limit(2),
+        "SELECT TOP @p0 * FROM c WHERE c.inventory > @p1 AND ARRAY_CONTAINS(@p2, c.id) ORDER BY c.id DESC",
+        [
+            {"name": "@p0", "value": 2},
+            {"name": "@p1", "value": 0},
+            {"name": "@p2", "value": ["SKU-A100", "SKU-A103", "SKU-B200"]},
+        ],
+        ["SKU-B200", "SKU-A103"],
+        id="combined",
+    ),
+]
+
+
+@pytest.mark.parametrize("query, sql, parameters, ids", CASES)
+def test_query_translations(query, sql, parameters, ids):
+    assert query.to_sql() == (sql, parameters)
+    assert [item["id"] for item in query.apply(ITEMS)] == ids
+
+
+def test_unsupported_operator_is_rejected():
+    with pytest.raises(ValueError):
+        Query().where("id", "LIKE", "SKU-%")
+
+
+def test_apply_skips_items_with_missing_or_incomparable_fields():
+    items = ITEMS + [{"id": "SKU-C300", "inventory": "unknown"}, "not an item"]
+
+    assert [item["id"] for item in Query().where("inventory", "<", 30).apply(items)] == ["SKU-A102", "SKU-B200"]
+
+
+def test_dapr_query_is_complete_when_all_conditions_run_server_side():
+    query = Query().where("id", "=", "SKU-A100").where_in("inventory", [0, 100]).order_by("id").limit(5)
+
+    assert query.to_dapr() == (
+        {
+            "filter": {"AND": [{"EQ": {"id": "SKU-A100"}}, {"IN": {"inventory": [0, 100]}}]},
+            "sort": [{"key": "id", "order": "ASC"}],
+            "page": {"limit": 5},
+        },
+        True,
+    )
+
+
+def test_dapr_query_is_filtered_client_side_otherwise():
+    query = Query().where_in("id", ["SKU-A100", "SKU-A103"]).where("inventory", ">", 60).limit(1)
+
+    # The comparison and the limit are left to apply, paging first would drop matches
+    assert query.to_dapr() == ({"filter": {"IN": {"id": ["SKU-A100", "SKU-A103"]}}}, False)
+    assert [item["id"] for item in query.apply(ITEMS)] == ["SKU-A100"]
@@ -0,0 +1,23 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from semantic_kernel import Kernel
+from semantic_kernel.agents import ChatCompletionAgent
+from semantic_kernel.contents import ChatMessageContent
+from semantic_kernel.contents.utils.author_role import AuthorRole
+
+from sk_ext.speaker_election_strategy import SpeakerElectionStrategy
+
+
+def test_single_candidate_after_user_message():
+    # The last message comes from the user, so there is no last speaker
+    pricing_agent = ChatCompletionAgent(id="pricing_agent", name="PricingAgent", instructions="Price orders")
+    strategy = SpeakerElectionStrategy(kernel=Kernel())
+    history = [ChatMessageContent(role=AuthorRole.USER, content="What is the price of SKU-A100?")]
+
+    agent, reason = strategy._select_agent_by_rules([pricing_agent], history)
+
+    assert agent is pricing_agent
+    assert reason == "Only candidate agent"
@@ -0,0 +1,124 @@
+import base64
+import enum
+import json
+import os
+import sys
+from datetime import datetime
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "../src/agents"))
+
+from actors.state_serializer import COMPACT_MARKER, MIN_COMPRESS_SIZE, CompactStateSerializer
+
+HISTORY = {
+    "system_message": None,
+    "messages": [
+        {"role": "user", "items": [{"content_type": "text", "text": f"I need {i} boxes of screws"}]}
+        for i in range(50)
+    ],
+}
+
+
+class Status(enum.Enum):
+    OPEN = "open"
+
+
+def _version(data: bytes) -> int:
+    """Codec version byte of a compact value."""
+    encoded = json.loads(data)
+    assert encoded.startswith(COMPACT_MARKER)
+    return base64.b64decode(encoded[len(COMPACT_MARKER) :])[0]
+
+
+@pytest.mark.parametrize(
+    "codec, version", [("msgpack", 1), ("msgpack+zstd", 2), ("msgpack+zlib", 3)]
+)
+def test_round_trip(codec, version):
+    serializer = CompactStateSerializer(codec)
+
+    data = serializer.serialize(HISTORY)
+
+    assert _version(data) == version
+    assert serializer.deserialize(data) == HISTORY
+
+
+def test_compressed_values_are_smaller_than_json():
+    data = CompactStateSerializer().serialize(HISTORY)
+
+    assert len(data) < len(json.dumps(HISTORY))
+
+
+def test_small_values_are_not_compressed():
+    value = {"segments": 2, "system_message": None}
+    serializer = CompactStateSerializer()
+
+    data = serializer.serialize(value)
+
+    assert len(data) < MIN_COMPRESS_SIZE
+    assert _version(data) == 1
+    assert serializer.deserialize(data) == value
+
+
+def test_json_codec_keeps_the_default_serializer():
+    serializer = CompactStateSerializer("json")
+
+    data = serializer.serialize(HISTORY)
+
+    assert json.loads(data) == HISTORY
+    assert serializer.deserialize(data) == HISTORY
+
+
+def test_custom_hook_is_serialized_as_json():
+    data = CompactStateSerializer().serialize(object(), custom_hook=lambda obj: {"kind": "custom"})
+
+    assert json.loads(data) == {"kind": "custom"}
+
+
+@pytest.mark.parametrize("codec", ["json", "msgpack", "msgpack+zstd", "msgpack+zlib"])
+def test_any_codec_reads_the_values_of_the_others(codec):
+    data = CompactStateSerializer(codec).serialize(HISTORY)
+
+    for other in ["json", "msgpack", "msgpack+zstd", "msgpack+zlib"]:
+        assert CompactStateSerializer(other).deserialize(data) == HISTORY
+
+
+def test_legacy_json_is_read():
+    # Values written by the default serializer of earlier versions, also as str by the admin
+    data = json.dumps(HISTORY).encode("utf-8")
+    serializer = CompactStateSerializer()
+
+    assert serializer.deserialize(data) == HISTORY
+    assert serializer.deserialize(data.decode("utf-8")) == HISTORY
+
+
+def test_deserialize_applies_the_custom_hook():
+    data = CompactStateSerializer().serialize(HISTORY)
+
+    messages = CompactStateSerializer().deserialize(data, custom_hook=lambda obj: obj["messages"])
+
+    assert messages == HISTORY["messages"]
+
+
+def test_enums_and_datetimes_are_stored_as_json_would():
+    value = {"status": Status.OPEN, "at": datetime(2025, 3, 1, 12, 30)}
+
+    data = CompactStateSerializer().serialize(value)
+
+    assert CompactStateSerializer().deserialize(data) == {
+        "status": "open",
+        "at": "2025-03-01T12:30:00",
+    }
+
+
+def test_unknown_codec_version_is_rejected():
+    encoded = base64.b64encode(bytes([99]) + b"\x80").decode("ascii")
+    data = f'"{COMPACT_MARKER}{encoded}"'.encode("ascii")
+
+    with pytest.raises(ValueError):
+        CompactStateSerializer().deserialize(data)
+
+
+def test_unknown_codec_name_is_rejected():
+    with pytest.raises(ValueError):
+        CompactStateSerializer("msgpack+lz4")